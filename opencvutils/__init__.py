@@ -0,0 +1,7 @@
+# OpenCVutils: video / frame / mask tools for python OpenCV 4
+#
+# Command line: `opencvutils <command>` (see cli.py). Importing the package
+# loads nothing else; import the modules that are needed, e.g.
+#   from opencvutils.play_video import get_frame, get_mask
+
+__version__ = '0.1.0'
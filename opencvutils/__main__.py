@@ -0,0 +1,4 @@
+# python -m opencvutils <command>
+from .cli import main
+
+main()
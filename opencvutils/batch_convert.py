@@ -0,0 +1,163 @@
+# Batch conversion of many inputs on a process pool
+#
+# Runs convert_video2frames (mode 'extract') or convert_frames2video (mode
+# 'encode') over a glob or a manifest of inputs inside one long-lived pool of
+# worker processes, so cv2 is imported once per worker instead of once per
+# file. Each job gets a thread budget (cv2 threads, image writer/decoder
+# threads, ffmpeg threads) so that jobs x threads matches the cores.
+#
+# Completed outputs are skipped on restart: extracted frame directories get
+# a '.complete' marker once all frames are written, encoded videos are
+# written under a temporary name and renamed when done.
+#
+# Examples:
+#   python -m opencvutils.batch_convert extract --inputs 'videos/*.mp4' --output_root frames/
+#   python -m opencvutils.batch_convert encode --manifest dirs.txt --output_root videos/ -- --fps 30
+#
+# Options after '--' are passed on to every job.
+
+import os
+import sys
+import argparse
+import traceback
+from io import StringIO
+from contextlib import redirect_stdout
+from glob import glob
+from time import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+COMPLETE_MARKER = '.complete'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m opencvutils.batch_convert')
+    parser.add_argument('mode', choices=('extract', 'encode'),
+                        help="extract: video -> frames, encode: frame directory -> video")
+    parser.add_argument('--inputs', type=str, default=None,
+                        help="glob pattern of inputs (quote it)")
+    parser.add_argument('--manifest', type=str, default=None,
+                        help="text file with one input per line, optionally '<input>\\t<output>' "
+                             "(encode outputs get .mp4 appended unless they end in .mp4)")
+    parser.add_argument('--output_root', type=str, default='.',
+                        help="directory for outputs without an explicit manifest output (default=.)")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="number of parallel jobs (default = cores / threads)")
+    parser.add_argument('--threads', type=int, default=2,
+                        help="thread budget per job (default=2)")
+    parser.add_argument('--force', action='store_true',
+                        help="redo jobs whose outputs are already complete")
+
+    # everything after '--' goes to the jobs
+    argv = sys.argv[1:] if argv is None else list(argv)
+    job_args = []
+    if '--' in argv:
+        k = argv.index('--')
+        argv, job_args = argv[:k], argv[k + 1:]
+
+    args = parser.parse_args(argv)
+    args.job_args = job_args
+    assert args.inputs or args.manifest, "Specify inputs with --inputs or --manifest"
+
+    return args
+
+
+def list_jobs(args):
+    # [(input, output)]
+    pairs = []
+    if args.inputs:
+        pairs += [(f, None) for f in sorted(glob(args.inputs))]
+    if args.manifest:
+        with open(args.manifest) as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                fields = line.split('\t')
+                pairs.append((fields[0], fields[1] if len(fields) > 1 else None))
+
+    jobs = []
+    for inp, out in pairs:
+        if out is None:
+            name = os.path.basename(inp.rstrip('/'))
+            if args.mode == 'extract':
+                out = os.path.join(args.output_root, name.split('.')[0] + "_frames")
+            else:
+                out = os.path.join(args.output_root, name + ".mp4")
+        elif args.mode == 'encode' and not out.endswith('.mp4'):
+            out += '.mp4'  # convert_frames2video only writes .mp4
+        jobs.append((inp, out))
+    return jobs
+
+
+def is_complete(mode, output):
+    if mode == 'extract':
+        return os.path.exists(os.path.join(output, COMPLETE_MARKER))
+    return os.path.exists(output)
+
+
+def _init_worker(threads):
+    import cv2
+    cv2.setNumThreads(threads)
+
+
+def run_job(mode, inp, out, threads, job_args):
+    # runs in a worker process, returns (input, frames, seconds, error)
+    start = time()
+    try:
+        with redirect_stdout(StringIO()):  # keep per-job chatter out of the batch log
+            if mode == 'extract':
+                from . import convert_video2frames as conv
+                argv = ['--input_file', inp, '--output_dir', out, '--writers', str(threads)] + job_args
+                n = conv.main(conv.parse_args(argv))
+                open(os.path.join(out, COMPLETE_MARKER), 'w').close()
+            else:
+                from . import convert_frames2video as conv
+                # write under a temporary name, so only finished videos carry the final name
+                os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+                root, ext = os.path.splitext(out)
+                partial = os.path.join(os.path.dirname(out), '.' + os.path.basename(root) + '.partial' + ext)
+                argv = ['--input_dir', inp, '--output_file', partial, '--quiet',
+                        '--workers', str(threads), '--encoder_threads', str(threads)] + job_args
+                n = conv.main(conv.parse_args(argv))
+                os.replace(partial, out)
+        return inp, n, time() - start, None
+    except BaseException:
+        return inp, 0, time() - start, traceback.format_exc()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    jobs = list_jobs(args)
+    assert jobs, "No inputs found"
+
+    todo = [(i, o) for i, o in jobs if args.force or not is_complete(args.mode, o)]
+    n_skipped = len(jobs) - len(todo)
+
+    threads = max(args.threads, 1)
+    n_jobs = args.jobs or max(1, (os.cpu_count() or 1) // threads)
+    print(f"{len(jobs)} inputs, {n_skipped} already complete, running {len(todo)} "
+          f"on {n_jobs} processes x {threads} threads")
+
+    start = time()
+    n_frames = 0
+    failures = []
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = [pool.submit(run_job, args.mode, i, o, threads, args.job_args) for i, o in todo]
+        for k, fut in enumerate(as_completed(futures), 1):
+            inp, n, elapsed, error = fut.result()
+            if error is None:
+                n_frames += n
+                print(f"[{k}/{len(todo)}] {inp}: {n} frames in {elapsed:.1f}s")
+            else:
+                failures.append((inp, error))
+                print(f"[{k}/{len(todo)}] {inp}: FAILED")
+
+    elapsed = time() - start
+    print(f"\nDone: {len(todo) - len(failures)} converted, {n_skipped} skipped, {len(failures)} failed")
+    print(f"{n_frames} frames in {elapsed:.1f}s ({n_frames / elapsed if elapsed > 0 else 0:.1f} frames/s, "
+          f"{(len(todo) - len(failures)) / elapsed if elapsed > 0 else 0:.2f} jobs/s)")
+    for inp, error in failures:
+        print(f"\n--- {inp} ---\n{error}")
+
+    sys.exit(1 if failures else 0)
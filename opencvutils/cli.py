@@ -0,0 +1,82 @@
+# opencvutils command line
+#
+#   opencvutils play --infile clip.mp4 --maskdir clip_masks
+#   opencvutils extract --input_file clip.mp4 --output_dir clip_frames
+#   opencvutils encode --input_dir clip_frames --output_file clip.mp4
+#   opencvutils reverse --video clip.mp4 --outvideo clip_rev.mp4
+#   opencvutils startup          (start-up time of each subcommand)
+#
+# Only the module of the chosen subcommand is imported. Optional heavy
+# dependencies (PIL for gifs, multiprocessing pools) are
+# imported by the code paths that use them, so a tool spawned by a batch
+# job pays for cv2 / numpy and little else. Without installing the package,
+# run it as `python -m opencvutils <command>` from the repository root.
+
+import os
+import sys
+import argparse
+from importlib import import_module
+
+# command: (module, description, prints "Completed successfully")
+COMMANDS = {
+    'play':    ('play_video', "play a video or frame directory, with masks, grids, exports", False),
+    'extract': ('convert_video2frames', "extract the frames of a video as images", True),
+    'encode':  ('convert_frames2video', "encode a frame directory (and masks) to a video", True),
+    'reverse': ('reverse', "reverse frame directories or videos", True),
+}
+
+
+def run(command, argv=None):
+    # parses argv for the subcommand and runs it in this process, returns its result
+    module_name, _, completed = COMMANDS[command]
+    module = import_module('.' + module_name, __package__)
+    result = module.main(module.parse_args(argv, prog=f"{__package__} {command}"))
+    if completed:
+        print("\nCompleted successfully")
+    return result
+
+
+def measure_startup(repeat=5):
+    # best and mean wall time of `python -m opencvutils <command> --help` (interpreter
+    # start, imports and argument parsing) against a bare interpreter and a bare cv2 import
+    import subprocess as sp
+    from time import perf_counter
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    runs = [('python', ['-c', 'pass']), ('import cv2', ['-c', 'import cv2'])]
+    runs += [(command, ['-m', __package__, command, '--help']) for command in COMMANDS]
+
+    print(f"{'command':<12} {'best ms':>8} {'mean ms':>8}")
+    for name, python_args in runs:
+        times = []
+        for _ in range(max(repeat, 1)):
+            start = perf_counter()
+            sp.run([sys.executable] + python_args, stdout=sp.DEVNULL, env=env, check=True)
+            times.append(perf_counter() - start)
+        print(f"{name:<12} {1000 * min(times):8.1f} {1000 * sum(times) / len(times):8.1f}")
+    print("\nimport details: python -X importtime -m opencvutils <command> --help")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='opencvutils',
+                                     description="Various image tools for python OpenCV 4")
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+    for command, (_, description, _) in COMMANDS.items():
+        # options are parsed by the subcommand itself (`opencvutils <command> --help`)
+        commands.add_parser(command, help=description, add_help=False)
+    startup = commands.add_parser('startup', help="measure the start-up time of each subcommand")
+    startup.add_argument('--repeat', type=int, default=5, help="runs per command (default=5)")
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(argv[:1])
+    if args.command == 'startup':
+        args = parser.parse_args(argv)
+        measure_startup(args.repeat)
+        return
+    run(args.command, argv[1:])
+
+
+if __name__ == '__main__':
+    main()
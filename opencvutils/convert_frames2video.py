@@ -0,0 +1,100 @@
+import argparse
+import cv2
+import os
+from itertools import repeat
+from .video_encoder import createVideoClip_Cmd, add_encoder_args, encoder_kw_from_args, QUEUE_SIZE
+from .frame_decode import decode_frames, add_decode_args
+from .frame_index import FrameIndex
+from .mask_overlay import add_overlay_args, overlay_from_args
+from .mask_store import MaskStore, is_mask_store
+from .frame_transform import FramePipeline, rotation_from_args
+from .stage_timer import add_profile_args, timer_from_args
+
+def parse_args(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog)
+    parser.add_argument('--input_dir', type=str, required=True, default=None,
+                        help="input directory of frames (assuming numeric ordering) or frame list (.txt)")
+
+    parser.add_argument('--mask_dir', type=str, required=False, default=None,
+                        help="(optional) input directory of masks (assuming numeric ordering) "
+                             "or mask store (.masks)")
+
+    parser.add_argument('--rotate_right', action='store_true', help="Rotate image by 90 deg clockwise")
+    parser.add_argument('--rotate_left', action='store_true', help="Rotate image by 90 deg anticlockwise")
+    parser.add_argument('--fps', type=int, default=25, help="frames per second encoding speed (default=25 fps)")
+    parser.add_argument('--output_file', type=str, default=None,
+                        help="name of output mp4 file (default = input directory name")
+    parser.add_argument('--quiet', action='store_true', help="do not list every frame file")
+    add_decode_args(parser)
+    add_encoder_args(parser)
+    add_overlay_args(parser)
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+
+    return args
+
+
+def main(args):
+    # encode the frames of args.input_dir, returns the number of frames written
+    assert os.path.exists(args.input_dir), f"Could not find input directory = {args.input_dir}"
+    inputdir = args.input_dir
+
+    imgfiles = FrameIndex(inputdir)
+
+    maskfiles = overlay = None
+    if args.mask_dir is not None:
+        assert os.path.exists(args.mask_dir), f"Mask directory specified, but could not be found = {args.mask_dir}"
+        maskfiles = MaskStore(args.mask_dir) if is_mask_store(args.mask_dir) else FrameIndex(args.mask_dir)
+        assert len(maskfiles) == len(imgfiles), \
+            f"Mismatch in number of mask files versus number of frames\n" + \
+            f"n_frames={len(imgfiles)}, n_masks={len(maskfiles)}"
+        overlay = overlay_from_args(args)
+
+    fps = args.fps
+    currdir = os.path.abspath(os.curdir)
+
+    if args.output_file is not None:
+        video_name = args.output_file
+    else:
+        video_name = os.path.basename(inputdir)
+    if not video_name.endswith(".mp4"): video_name = video_name + ".mp4"
+
+    timer = timer_from_args(args)
+
+    # output frames are queued for the encoder thread without a copy, so the
+    # pipeline cycles through enough buffers to cover the queue
+    pipeline = FramePipeline(rotate=rotation_from_args(args), overlay=overlay,
+                             buffers=QUEUE_SIZE + 2, timer=timer)
+
+    def read_frames():
+        decoded = decode_frames(imgfiles, workers=args.workers, prefetch=args.prefetch,
+                                use_processes=args.decode_processes)
+        if maskfiles is None:
+            masks = repeat(None)
+        elif isinstance(maskfiles, MaskStore):
+            masks = maskfiles.frames()
+        else:
+            masks = decode_frames(maskfiles, flags=cv2.IMREAD_GRAYSCALE, workers=args.workers,
+                                  prefetch=args.prefetch, use_processes=args.decode_processes)
+        decoded = timer.timed('decode', decoded)
+        masks = timer.timed('mask_read', masks) if maskfiles is not None else masks
+        for i, (imgfile, out_frame, mask) in enumerate(zip(imgfiles, decoded, masks)):
+            if not args.quiet:
+                print(imgfile)
+
+            yield pipeline(out_frame, mask, i)
+
+    outputfile = os.path.join(currdir,video_name)
+
+    # frames are streamed to the encoder thread as they are read (BGR, no stacking)
+    n = createVideoClip_Cmd(read_frames(), outputfile, fps, timer=timer, **encoder_kw_from_args(args))
+    print(f"\nVideo output file:{outputfile} ({n} frames)")
+    timer.report(args.trace)
+
+    return n
+
+
+if __name__ == '__main__':
+    main(parse_args())
+    print("\nCompleted successfully")
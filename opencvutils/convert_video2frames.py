@@ -0,0 +1,252 @@
+import argparse
+import cv2
+import os
+import numpy as np
+from math import log10, ceil, floor
+from time import time
+from .frame_writer import FrameWriter, imwrite_params
+from .video_probe import VideoProbe
+from .seek_index import SeekIndex, TIME_TOLERANCE
+from .stage_timer import add_profile_args, timer_from_args
+from .frame_transform import FramePipeline, BufferRing, rotation_from_args
+
+def parse_args(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog)
+    parser.add_argument('--input_file', type=str, required=True, default=None,
+                        help="input video file (.avi, .mp4, .mkv, mov)")
+    parser.add_argument('--rotate_right', action='store_true', help="Rotate image by 90 deg clockwise")
+    parser.add_argument('--rotate_left', action='store_true', help="Rotate image by 90 deg anticlockwise")
+    parser.add_argument('--image_type', type=str, default='png', help="output frame file type (def=png)")
+    parser.add_argument('--output_dir', type=str, default=None,
+                        help="name of output directory (default = base of input file name")
+    parser.add_argument('--png_compression', type=int, default=None,
+                        help="PNG compression level 0..9 (default = OpenCV default)")
+    parser.add_argument('--jpeg_quality', type=int, default=None,
+                        help="JPEG quality 0..100 (default = OpenCV default)")
+    parser.add_argument('--writers', type=int, default=None,
+                        help="number of image encoder threads (default = number of cores)")
+    parser.add_argument('--queue_size', type=int, default=None,
+                        help="max frames waiting to be written (default = 2 x writers)")
+    parser.add_argument('--segments', type=int, default=1,
+                        help="split the video at keyframes and extract the segments in this many "
+                             "processes (0 = number of cores, default=1)")
+    parser.add_argument('--every', type=int, default=None,
+                        help="keep only every N-th frame (skipped frames are not decoded)")
+    parser.add_argument('--target_fps', type=float, default=None,
+                        help="keep frames at about this rate, counted in frames at the average "
+                             "frame rate (skipped frames are not decoded)")
+    parser.add_argument('--start', type=float, default=None,
+                        help="start time in seconds (seeks via keyframes); times become frame "
+                             "numbers at the average frame rate, so on variable frame rate video "
+                             "the start is exact as a frame number, not as a time")
+    parser.add_argument('--end', type=float, default=None,
+                        help="end time in seconds (exclusive, a frame number like --start)")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    assert args.every is None or args.target_fps is None, "Use either --every or --target_fps"
+    assert args.every is None or args.every >= 1, f"--every must be >= 1, got {args.every}"
+    assert args.target_fps is None or args.target_fps > 0, f"--target_fps must be > 0"
+
+    return args
+
+
+def frame_buffers(writer, rotate, timer=None):
+    # (decode ring, pipeline) sized so that no buffer is reused while its frame
+    # is still queued in the writer or being written
+    n_buf = writer.queue.maxsize + writer.workers + 2
+    pipeline = FramePipeline(rotate=rotate, buffers=n_buf, timer=timer)
+    decoded = BufferRing(1 if not pipeline.identity else n_buf)
+    return decoded, pipeline
+
+
+def is_sampling(args):
+    return any(v is not None for v in (args.every, args.target_fps, args.start, args.end))
+
+
+def frame_selection(args, fps):
+    # (first frame, end frame or None, keep(n)) for the sampling options
+    first = round(args.start * fps) if args.start else 0
+    last = round(args.end * fps) if args.end is not None else None
+    assert last is None or last > first, f"Invalid time window --start={args.start} --end={args.end}"
+
+    if args.every:
+        every = args.every
+        keep = lambda n: (n - first) % every == 0
+    elif args.target_fps and args.target_fps < fps:
+        # keep the first frame of each output period
+        step = fps / args.target_fps
+        keep = lambda n: floor((n - first) / step) != floor((n - first - 1) / step)
+    else:
+        keep = lambda n: True
+    return first, last, keep
+
+
+def split_segments(index, n_segments):
+    # [(start, finish)] frame ranges starting on keyframes, covering 0..index.n_frames
+    n = index.n_frames
+    starts = sorted({index.keyframe_before(n * k // n_segments)[0] for k in range(n_segments)})
+    return [(s, f) for s, f in zip(starts, starts[1:] + [None])]
+
+
+def _init_segment_worker(threads):
+    cv2.setNumThreads(threads)
+
+
+def extract_segment(inputfile, outputdir, start, finish, padlength, imagetype, params, rotate,
+                    writers=None, index_data=None):
+    # runs in a worker process: writes frames start..finish-1 (to the end if finish is None)
+    # under the same names as the sequential path, returns the number of frames written,
+    # or None if the segment did not start on frame `start` (by timestamp) or ended early
+    # index_data: SeekIndex.as_dict() of the parent, so workers never rescan the file
+    cap = cv2.VideoCapture(inputfile)
+    assert cap.isOpened(), f"Could not open {inputfile}"
+    index = SeekIndex(inputfile, data=index_data)
+    if start > 0:
+        index.seek(cap, start)
+    k, key_time = index.keyframe_before(start)  # segments start on keyframes
+
+    n = start
+    with FrameWriter(writers, params=params) as writer:
+        decoded, pipeline = frame_buffers(writer, rotate)
+        while finish is None or n < finish:
+            ret, frame = cap.read(decoded.next())
+            if not ret: break
+            if n == start and (k != start or
+                               abs(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000 - key_time) > TIME_TOLERANCE):
+                break  # landed on the wrong frame, nothing is written
+            frame = pipeline(decoded.keep(frame))
+
+            fname = str(n).rjust(padlength,'0') + '.' + imagetype
+            writer.write(os.path.join(outputdir,fname),frame,n)
+            n += 1
+    cap.release()
+
+    if n == start or (finish is not None and n != finish):
+        return None
+    return writer.n_written
+
+
+def extract_segments(inputfile, outputdir, segments, padlength, imagetype, params, rotate,
+                     writers=None, index=None):
+    # extracts each (start, finish) segment in its own process, returns the number of
+    # frames written, or None if a segment failed or the total is not index.n_frames
+    # index: the SeekIndex of inputfile, shared with the workers instead of rebuilt there
+    n_frames = index.n_frames if index is not None else None
+    index_data = index.as_dict() if index is not None else None
+    from concurrent.futures import ProcessPoolExecutor  # loads multiprocessing
+    n_proc = len(segments)
+    if writers is None:
+        writers = max(1, (os.cpu_count() or 1) // n_proc)
+    threads = max(1, (os.cpu_count() or 1) // n_proc)
+
+    start = time()
+    with ProcessPoolExecutor(max_workers=n_proc, initializer=_init_segment_worker,
+                             initargs=(threads,)) as pool:
+        futures = [pool.submit(extract_segment, inputfile, outputdir, s, f, padlength,
+                               imagetype, params, rotate, writers, index_data)
+                   for s, f in segments]
+        written = [fut.result() for fut in futures]
+    elapsed = time() - start
+
+    if None in written or (n_frames is not None and sum(written) != n_frames):
+        failed = [f"{s}-{f if f is not None else 'end'}" for (s, f), w in zip(segments, written) if w is None]
+        print(f"Segment extraction is not exact ({sum(w or 0 for w in written)} of {n_frames} frames"
+              + (f", failed segments {', '.join(failed)}" if failed else "") + ")")
+        return None
+    n = sum(written)
+
+    print(f"Wrote {n} frames in {elapsed:.2f}s ({n / elapsed if elapsed > 0 else 0:.1f} frames/s) "
+          f"from {n_proc} segments")
+    return n
+
+
+def main(args):
+    # extract all frames of args.input_file, returns the number of frames written
+    assert os.path.exists(args.input_file), f"Could not find input file = {args.input_file}"
+    inputfile = args.input_file
+
+    currdir = os.path.abspath(os.curdir)
+
+    if args.output_dir is not None:
+        outputdir = args.output_dir
+    else:
+        outputdir = os.path.basename(inputfile).split('.')[0]
+        outputdir = os.path.join(currdir,outputdir + "_frames")
+
+    os.makedirs(outputdir, exist_ok=True)
+
+    probe = VideoProbe(inputfile)
+    cap = probe.capture()
+
+    length = probe.n_frames
+
+    padlength = ceil(log10(length))
+    imagetype = args.image_type
+
+    params = imwrite_params(imagetype, args.png_compression, args.jpeg_quality)
+
+    n_segments = args.segments if args.segments > 0 else (os.cpu_count() or 1)
+    if n_segments > 1 and is_sampling(args):
+        print("Sampling options are extracted sequentially, ignoring --segments")
+    elif n_segments > 1:
+        index = SeekIndex(inputfile)
+        segments = split_segments(index, n_segments)
+        if len(segments) > 1:
+            cap.release()
+            if args.profile or args.trace:
+                print("Per-stage timing is only available for sequential extraction (--segments 1)")
+            n = extract_segments(inputfile, outputdir, segments, padlength, imagetype,
+                                 params, rotation_from_args(args), args.writers, index)
+            if n is not None:
+                return n
+            print("Extracting sequentially instead")
+            cap = probe.capture()
+        else:
+            print("Only one keyframe, extracting sequentially")
+
+    rotate = rotation_from_args(args)
+    timer = timer_from_args(args)
+
+    # frames that are not kept are only grab()bed, never decoded to an image;
+    # files keep the source frame numbers
+    first, last, keep = frame_selection(args, probe.fps or 25)
+    if first > 0:
+        assert first < length, f"--start={args.start}s is beyond the end of the video"
+        SeekIndex(inputfile).seek(cap, first)
+
+    n = first
+    with FrameWriter(args.writers, args.queue_size, params, timer) as writer:
+        decoded, pipeline = frame_buffers(writer, rotate, timer)
+        while last is None or n < last:
+            if not keep(n):
+                with timer.stage('grab', n):
+                    ret = cap.grab()
+                if not ret: break
+                n += 1
+                continue
+
+            with timer.stage('decode', n):
+                ret, frame = cap.read(decoded.next())
+
+            if not ret: break
+
+            frame = pipeline(decoded.keep(frame), i=n)
+
+            fname = str(n).rjust(padlength,'0') + '.' + imagetype
+            with timer.stage('queue_wait', n):
+                writer.write(os.path.join(outputdir,fname),frame,n)
+
+            n += 1
+
+    cap.release()
+
+    print(f"Wrote {writer.n_written} frames in {writer.elapsed:.2f}s ({writer.fps:.1f} frames/s)")
+    timer.report(args.trace)
+
+    return writer.n_written
+
+
+if __name__ == '__main__':
+    main(parse_args())
+    print("\nCompleted successfully")
@@ -0,0 +1,28 @@
+# Direct frames to video using FFMPEG executable
+
+import argparse
+from .video_encoder import createVideoClip_Cmd, add_encoder_args, encoder_kw_from_args
+from .frame_decode import decode_frames, add_decode_args
+from .frame_index import FrameIndex
+
+if __name__ == "__main__":
+
+    parser= argparse.ArgumentParser()
+    parser.add_argument('--input_dir', type=str, required=True, default=None,
+                        help="input directory of frames (assuming numeric ordering)")
+    parser.add_argument('--fps', type=int, default=25, 
+            help="frames per second encoding speed (default=25 fps)")
+
+    parser.add_argument('--output_file', type=str, default=None,
+                        help="name of output mp4 file (default = input directory name")
+    add_decode_args(parser)
+    add_encoder_args(parser)
+
+    args = parser.parse_args()
+
+    resultfiles = FrameIndex(args.input_dir)
+    clip = decode_frames(resultfiles, workers=args.workers, prefetch=args.prefetch,
+                         use_processes=args.decode_processes)
+
+    createVideoClip_Cmd(clip, args.output_file, args.fps, **encoder_kw_from_args(args))
+    print("Done")
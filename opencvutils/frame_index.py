@@ -0,0 +1,166 @@
+# Frame-directory index
+#
+# A frame directory is listed once with os.scandir and sorted in natural
+# numeric order ("2.png" before "10.png", "f9.jpg" before "f10.jpg"). The
+# result is kept in a small manifest next to the directory which is reused
+# for as long as the directory mtime is unchanged. Sequences that follow a
+# single numbering pattern (e.g. 00000.png .. 99999.png) are stored as just
+# the pattern, so lookup of frame i is O(1) without holding a name list.
+#
+# A frame list ('<name>.txt' with "<frame name>\t<source file>" lines, e.g.
+# the virtual reversal written by `reverse --mode manifest`) is indexed like
+# a directory holding those source files in the listed order.
+
+import os
+import re
+
+FRAME_EXTS = (('.jpg', '.jpeg'), ('.png',))  # in order of preference
+
+_num_re = re.compile(r'(\d+)')
+_pattern_re = re.compile(r'^(.*?)(\d+)(\.[^.]+)$')
+
+MANIFEST_VERSION = 1
+FRAME_LIST_EXT = '.txt'
+
+
+def natural_key(name):
+    # "frame10.png" -> ('frame', 10, '.png')
+    parts = _num_re.split(name)
+    return tuple(int(p) if i % 2 else p for i, p in enumerate(parts))
+
+
+def scan_frames(vdir):
+    # returns the naturally sorted frame file names (no directory) of vdir
+    found = {exts: [] for exts in FRAME_EXTS}
+    with os.scandir(vdir) as it:
+        for entry in it:
+            ext = os.path.splitext(entry.name)[1].lower()
+            for exts in FRAME_EXTS:
+                if ext in exts and entry.is_file():
+                    found[exts].append(entry.name)
+                    break
+
+    for exts in FRAME_EXTS:
+        if found[exts]:
+            return sorted(found[exts], key=natural_key)
+    return []
+
+
+def _as_pattern(names):
+    # (prefix, width, suffix, first) if names are one contiguous numbered run
+    m = _pattern_re.match(names[0])
+    if m is None:
+        return None
+    prefix, digits, suffix = m.groups()
+    width = len(digits) if digits.startswith('0') and len(digits) > 1 else 0
+    first = int(digits)
+    for i, name in enumerate(names):
+        num = str(first + i).rjust(width, '0')
+        if name != prefix + num + suffix:
+            return None
+    return (prefix, width, suffix, first)
+
+
+def is_frame_list(path):
+    return path is not None and os.path.isfile(path) and path.endswith(FRAME_LIST_EXT)
+
+
+def read_frame_list(path):
+    # [(frame name, absolute source file)] of a frame list, relative sources are
+    # resolved against the list's directory
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding='utf-8') as f:
+        pairs = [line.rstrip('\n').split('\t', 1) for line in f if line.strip()]
+    assert all(len(p) == 2 for p in pairs), f"Not a frame list ('<name>\\t<file>' lines): {path}"
+    return [(name, os.path.normpath(os.path.join(base, fsrc))) for name, fsrc in pairs]
+
+
+class FrameIndex:
+    def __init__(self, vdir, manifest=True):
+        assert os.path.isdir(vdir) or is_frame_list(vdir), f"Frame directory not found: {vdir}"
+        self.vdir = vdir
+        self.names = None
+        self.pattern = None
+        self.count = 0
+
+        if is_frame_list(vdir):
+            # absolute names: os.path.join(vdir, name) is the source file itself
+            self.names = [fsrc for _, fsrc in read_frame_list(vdir)]
+            self.count = len(self.names)
+            assert self.count, f"No frames listed in {vdir}"
+            return
+
+        mtime = os.stat(vdir).st_mtime_ns
+        if not (manifest and self._load_manifest(mtime)):
+            names = scan_frames(vdir)
+            self.count = len(names)
+            self.pattern = _as_pattern(names) if names else None
+            if self.pattern is None:
+                self.names = names
+            if manifest:
+                self._save_manifest(mtime)
+
+        assert self.count, f"No image file (*.jpg or *.png) found in {vdir}"
+
+    ### manifest
+    @property
+    def manifest(self):
+        path = os.path.abspath(self.vdir).rstrip(os.sep)
+        return os.path.join(os.path.dirname(path), '.' + os.path.basename(path) + '.frames')
+
+    def _load_manifest(self, mtime):
+        # header line: version mtime count [prefix width suffix first], then names
+        try:
+            with open(self.manifest, encoding='utf-8') as f:
+                header = f.readline().rstrip('\n').split('\t')
+                if int(header[0]) != MANIFEST_VERSION or int(header[1]) != mtime:
+                    return False
+                self.count = int(header[2])
+                if len(header) == 7:
+                    self.pattern = (header[3], int(header[4]), header[5], int(header[6]))
+                else:
+                    self.names = f.read().split('\n')[:self.count]
+                    if len(self.names) != self.count:
+                        return False
+        except (OSError, ValueError, IndexError):
+            self.names = self.pattern = None
+            return False
+        return True
+
+    def _save_manifest(self, mtime):
+        header = [str(MANIFEST_VERSION), str(mtime), str(self.count)]
+        if self.pattern is not None:
+            header += [str(p) for p in self.pattern]
+        try:
+            with open(self.manifest, 'w', encoding='utf-8') as f:
+                f.write('\t'.join(header) + '\n')
+                if self.names is not None:
+                    f.write('\n'.join(self.names))
+        except OSError:
+            pass  # read-only storage: index is simply rebuilt next time
+
+    ### lookup
+    def name(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(f"frame {i} out of range for {self.count} frames in {self.vdir}")
+        if self.pattern is not None:
+            prefix, width, suffix, first = self.pattern
+            return prefix + str(first + i).rjust(width, '0') + suffix
+        return self.names[i]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        return os.path.join(self.vdir, self.name(i))
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def __repr__(self):
+        return f"FrameIndex({self.vdir!r}, n_frames={self.count})"
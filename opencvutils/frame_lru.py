@@ -0,0 +1,96 @@
+# Decoded-frame LRU cache
+#
+# FrameLRU keeps decoded (or fully rendered) frames keyed by frame number
+# and evicts the least recently used ones once the total size exceeds a
+# byte budget. Cached arrays are marked read-only, so anything that wants to
+# draw on a cached frame has to copy it first.
+#
+# SequentialSource sits between a forward-only frame reader and the display
+# loop: frames come from the LRU when possible, otherwise from the reader,
+# which is reopened at the requested frame whenever playback jumps (restart,
+# stepping back).
+
+from collections import OrderedDict
+
+
+class FrameLRU:
+    def __init__(self, budget):
+        self.budget = budget  # bytes
+        self.nbytes = 0
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        # value: tuple of numpy arrays (None entries allowed)
+        size = sum(a.nbytes for a in value if a is not None)
+        if size > self.budget:
+            return
+        for a in value:
+            if a is not None:
+                a.flags.writeable = False
+
+        old = self.items.pop(key, None)
+        if old is not None:
+            self.nbytes -= sum(a.nbytes for a in old if a is not None)
+        self.items[key] = value
+        self.nbytes += size
+
+        while self.nbytes > self.budget:
+            _, old = self.items.popitem(last=False)
+            self.nbytes -= sum(a.nbytes for a in old if a is not None)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class SequentialSource:
+    def __init__(self, open_reader, lru=None):
+        # open_reader(i): returns a ReadAhead-like iterable of (i, frame, mask) starting at i
+        self.open_reader = open_reader
+        self.lru = lru
+        self.reader = None
+        self.items = None
+        self.next_i = None
+        self.end = None  # number of frames the source actually delivered, once known
+
+    def get(self, i):
+        # (frame, mask) of frame i, None if the source ends before frame i
+        if self.end is not None and i >= self.end:
+            return None
+        if self.lru is not None:
+            value = self.lru.get(i)
+            if value is not None:
+                return value
+
+        if self.reader is None or self.next_i is None or i < self.next_i:
+            self.stop()
+            self.reader = self.open_reader(i)
+            self.items = iter(self.reader)
+
+        for j, frame, mask in self.items:
+            self.next_i = j + 1
+            if self.lru is not None:
+                self.lru.put(j, (frame, mask))
+            if j == i:
+                return frame, mask
+
+        # the source decoded fewer frames than it reported (e.g. the container count)
+        self.end = self.next_i if self.next_i is not None else i
+        return None
+
+    def stop(self):
+        if self.reader is not None:
+            self.reader.stop()
+        self.reader = self.items = self.next_i = None
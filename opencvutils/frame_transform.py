@@ -0,0 +1,111 @@
+# Per-frame transform pipeline with preallocated buffers
+#
+# FramePipeline is set up once per stream with the requested operations and
+# applies them in a fixed order:
+#
+#   mask overlay (in place) -> rotate -> resize -> colour conversion -> label
+#
+# The geometry and colour steps write into preallocated output buffers
+# (cv2 dst= arguments) that are allocated on the first frame and reused for
+# every later frame of the same size, so steady-state processing allocates
+# nothing per frame. The overlay and the label are drawn in place.
+#
+# Frames handed to asynchronous consumers (writer threads, encoder queues)
+# must not be overwritten while they are still queued: `buffers` sets how
+# many output frames are cycled through (queue depth + frames in flight).
+# BufferRing provides the same for decoders (VideoCapture.read(image=...)).
+
+import cv2
+from .stage_timer import StageTimer
+
+# frame number label (play_video --frame_num)
+FONTCONFIG = {
+    "font"         : cv2.FONT_HERSHEY_SIMPLEX,
+    "rel_coords"   : (0.8, 0.05),
+    "cornercoords" : (10,500),
+    "minY"         : 30,
+    "fontScale"    : 1,
+    "fontColor"    : (0,255,0),
+    "lineType"     : 2
+}
+
+
+def rotation_from_args(args):
+    # cv2 rotate code for --rotate_left / --rotate_right, None if not rotating
+    if args.rotate_left:
+        return cv2.ROTATE_90_COUNTERCLOCKWISE
+    if args.rotate_right:
+        return cv2.ROTATE_90_CLOCKWISE
+    return None
+
+
+class BufferRing:
+    # n reusable arrays of one shape, handed out round robin
+    def __init__(self, n=1):
+        self.n = max(n, 1)
+        self.buffers = [None] * self.n
+        self.k = 0
+
+    def next(self):
+        # the current slot: None until first filled, then reused by cv2 as dst
+        # (cv2 returns a new array instead if the frame size changed)
+        return self.buffers[self.k]
+
+    def keep(self, arr):
+        # store arr (e.g. returned by cv2) in the current slot and advance
+        self.buffers[self.k] = arr
+        self.k = (self.k + 1) % self.n
+        return arr
+
+
+class FramePipeline:
+    def __init__(self, rotate=None, resize=None, convert=None, label=False, overlay=None,
+                 interpolation=cv2.INTER_AREA, fontconfig=FONTCONFIG, buffers=1, timer=None):
+        # rotate: cv2.ROTATE_* code; resize: (width, height); convert: cv2.COLOR_* code
+        # label: draw the frame number; overlay: MaskOverlay applied with the mask
+        # timer: optional StageTimer, records each step under its name
+        self.overlay = overlay
+        self.label = label
+        self.fontconfig = fontconfig
+        self.timer = timer if timer is not None else StageTimer(enabled=False)
+
+        self.steps = []  # (name, function(src, dst) -> dst)
+        if rotate is not None:
+            self.steps.append(('rotate', lambda src, dst: cv2.rotate(src, rotate, dst=dst)))
+        if resize is not None:
+            size = tuple(resize)
+            self.steps.append(('resize', lambda src, dst: cv2.resize(src, size, dst=dst,
+                                                                     interpolation=interpolation)))
+        if convert is not None:
+            self.steps.append(('convert', lambda src, dst: cv2.cvtColor(src, convert, dst=dst)))
+        # only the output of the last step leaves the pipeline
+        self.rings = [BufferRing(buffers if k == len(self.steps) - 1 else 1)
+                      for k in range(len(self.steps))]
+
+    @property
+    def identity(self):
+        # True if frames are only drawn on in place
+        return not self.steps
+
+    def __call__(self, frame, mask=None, i=None):
+        # runs all steps, returns the output frame (a pipeline buffer unless identity);
+        # frame is modified in place by the overlay
+        if mask is not None and self.overlay is not None:
+            with self.timer.stage('overlay', i):
+                self.overlay.apply(frame, mask)
+
+        for (name, fn), ring in zip(self.steps, self.rings):
+            with self.timer.stage(name, i):
+                frame = ring.keep(fn(frame, ring.next()))
+
+        if self.label and i is not None:
+            with self.timer.stage('label', i):
+                self.draw_label(frame, i)
+        return frame
+
+    def draw_label(self, frame, i):
+        fc = self.fontconfig
+        real_x = round(fc["rel_coords"][0] * frame.shape[1])
+        real_y = max(round(fc["rel_coords"][1] * frame.shape[0]), fc['minY'])
+        cv2.putText(frame, str(i), (real_x, real_y), fc['font'], fc['fontScale'],
+                    fc['fontColor'], fc['lineType'])
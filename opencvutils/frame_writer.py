@@ -0,0 +1,89 @@
+# Concurrent image writer
+#
+# Frames are handed to a bounded queue and compressed/written by a pool of
+# encoder threads (cv2.imwrite releases the GIL). When the queue is full the
+# producer blocks, so memory use is capped at queue_size frames.
+
+import os
+import cv2
+import threading
+from queue import Queue
+from time import time, perf_counter
+
+
+def imwrite_params(image_type, png_compression=None, jpeg_quality=None):
+    image_type = image_type.lower()
+    params = []
+    if image_type == 'png' and png_compression is not None:
+        assert 0 <= png_compression <= 9, f"PNG compression must be 0..9, got {png_compression}"
+        params = [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+    elif image_type in ('jpg', 'jpeg') and jpeg_quality is not None:
+        assert 0 <= jpeg_quality <= 100, f"JPEG quality must be 0..100, got {jpeg_quality}"
+        params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+    return params
+
+
+class FrameWriter:
+    def __init__(self, workers=None, queue_size=None, params=None, timer=None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = max(workers, 1)
+        if queue_size is None:
+            queue_size = 2 * self.workers
+        self.params = params or []
+        self.timer = timer  # optional StageTimer, records 'encode' per image
+
+        self.queue = Queue(maxsize=max(queue_size, 1))
+        self.errors = []
+        self.n_written = 0
+        self._lock = threading.Lock()
+        self.start = time()
+
+        self.threads = [threading.Thread(target=self._work, daemon=True)
+                        for _ in range(self.workers)]
+        for t in self.threads:
+            t.start()
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            fname, frame, n = item
+            try:
+                t0 = perf_counter()
+                ok = cv2.imwrite(fname, frame, self.params)
+                if self.timer is not None:
+                    self.timer.add('encode', perf_counter() - t0, n, t0)
+                assert ok, f"Could not write image file: {fname}"
+                with self._lock:
+                    self.n_written += 1
+            except Exception as e:
+                self.errors.append(e)
+
+    def write(self, fname, frame, n=None):
+        # blocks while the queue is full (backpressure on the decoder)
+        if self.errors:
+            raise self.errors[0]
+        self.queue.put((fname, frame, n))
+
+    def close(self):
+        for _ in self.threads:
+            self.queue.put(None)
+        for t in self.threads:
+            t.join()
+        self.elapsed = time() - self.start
+        if self.errors:
+            raise self.errors[0]
+
+    @property
+    def fps(self):
+        elapsed = getattr(self, 'elapsed', time() - self.start)
+        return self.n_written / elapsed if elapsed > 0 else 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,96 @@
+# Streaming GIF writer
+#
+# Each frame is (optionally) downscaled, quantized to a 256 colour palette
+# and appended to the file as soon as it arrives, so memory use does not
+# grow with the length of the clip. With shared_palette the palette of the
+# first frame is used as the global colour table and all later frames are
+# mapped onto it (smaller files, less flicker between frames); otherwise
+# every frame carries its own local colour table.
+
+import cv2
+import struct
+from time import perf_counter
+from PIL import Image, GifImagePlugin
+
+
+def _o16(i):
+    return struct.pack('<H', i)
+
+
+def _palette_bytes(im):
+    # palette padded to the full 256 entries (colour table size field = 7)
+    pal = im.palette.palette[:768]
+    return pal + b'\0' * (768 - len(pal))
+
+
+class GifWriter:
+    def __init__(self, filename, fps, scale=1.0, skip=1, shared_palette=False, loop=0):
+        assert skip >= 1, f"GIF frame skip must be >= 1, got {skip}"
+        assert 0.0 < scale <= 1.0, f"GIF scale must be in (0, 1], got {scale}"
+        self.filename = filename
+        self.scale = scale
+        self.skip = skip
+        self.shared_palette = shared_palette
+        self.loop = loop
+        self.duration = round(1000.0 * skip / fps)  # ms per written frame
+
+        self.fp = open(filename, 'wb')
+        self.palette = None
+        self.size = None
+        self.n_in = 0
+        self.n_written = 0
+        self.encode_time = 0.0
+
+    def _write_header(self, im):
+        w, h = im.size
+        flags = 0x80 | 0x70 | 0x07 if self.shared_palette else 0x70
+        self.fp.write(b'GIF89a' + _o16(w) + _o16(h) + bytes([flags, 0, 0]))
+        if self.shared_palette:
+            self.fp.write(_palette_bytes(im))
+        # NETSCAPE2.0 application extension: loop count
+        self.fp.write(b'!\xff\x0bNETSCAPE2.0\x03\x01' + _o16(self.loop) + b'\0')
+
+    def write(self, frame):
+        # frame: HxWx3 uint8 BGR, only every `skip`-th frame is kept
+        self.n_in += 1
+        if (self.n_in - 1) % self.skip:
+            return
+
+        t = perf_counter()
+        if self.scale < 1.0:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale,
+                               interpolation=cv2.INTER_AREA)
+        im = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+        if self.palette is None:
+            im = im.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+            if self.shared_palette:
+                self.palette = im
+        else:
+            im = im.quantize(palette=self.palette)
+
+        if self.size is None:
+            self.size = im.size
+            self._write_header(im)
+        assert im.size == self.size, f"GIF frame size changed from {self.size} to {im.size}"
+
+        for chunk in GifImagePlugin.getdata(im, duration=self.duration,
+                                            include_color_table=not self.shared_palette):
+            self.fp.write(chunk)
+
+        self.n_written += 1
+        self.encode_time += perf_counter() - t
+
+    def close(self):
+        if self.fp is None:
+            return
+        self.fp.write(b';')  # trailer
+        self.fp.close()
+        self.fp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
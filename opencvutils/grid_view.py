@@ -0,0 +1,57 @@
+# Tiled multi-stream view
+#
+# GridCanvas is one preallocated rows x cols canvas; tile k is a view into
+# it, so composing a frame is one copy per stream (no concatenation, no new
+# canvas per frame). grid_tiles runs on each stream's own ReadAhead thread
+# and delivers frames already rotated / overlaid / scaled to the tile size
+# (through a FramePipeline with enough buffers for the read-ahead queue),
+# so the display thread only copies tiles and draws the label.
+
+import cv2
+import numpy as np
+from math import ceil, sqrt
+from itertools import repeat
+from .frame_transform import FramePipeline
+
+
+def grid_shape(n, cols=None):
+    # (rows, cols) for n tiles, as square as possible by default
+    cols = cols or ceil(sqrt(n))
+    return ceil(n / cols), cols
+
+
+class GridCanvas:
+    def __init__(self, n, tile_size, cols=None):
+        # tile_size: (width, height) of one tile
+        self.n = n
+        self.rows, self.cols = grid_shape(n, cols)
+        self.tile_w, self.tile_h = tile_size
+        self.image = np.zeros((self.rows * self.tile_h, self.cols * self.tile_w, 3), np.uint8)
+        self.tiles = [self.image[r * self.tile_h:(r + 1) * self.tile_h,
+                                 c * self.tile_w:(c + 1) * self.tile_w]
+                      for r in range(self.rows) for c in range(self.cols)][:n]
+
+    def put(self, k, frame):
+        # frame: tile-sized HxWx3 (or HxW gray) image
+        if frame.ndim == 2:
+            cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR, dst=self.tiles[k])
+        else:
+            np.copyto(self.tiles[k], frame)
+
+
+def grid_tiles(frames, tile_size, first, rotate=None, masks=None, overlay=None, buffers=1):
+    # yields (i, tile) from frame `first` on; frames/masks are iterators from frame `first`
+    # the tile is a pipeline buffer, `buffers` must cover the consumer's read-ahead
+    pipelines = {}  # one per input frame size
+    if masks is None:
+        masks = repeat(None)
+    for i, (frame, mask) in enumerate(zip(frames, masks), first):
+        size = frame.shape[1::-1]
+        if size not in pipelines:
+            w, h = size
+            if rotate in (cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_90_COUNTERCLOCKWISE):
+                w, h = h, w
+            resize = tuple(tile_size) if (w, h) != tuple(tile_size) else None
+            pipelines[size] = FramePipeline(rotate=rotate, resize=resize, overlay=overlay,
+                                            buffers=buffers)
+        yield i, pipelines[size](frame, mask)
@@ -0,0 +1,90 @@
+# In-place mask overlay for uint8 BGR frames
+#
+# All work is done by cv2 masked operations writing straight into the
+# frame; scratch buffers (thresholded mask, solid colour image and blend
+# result) are allocated once per frame size and reused. Masks are
+# single-channel uint8; pixels above `threshold` are treated as foreground.
+#
+# Modes:
+#   tint     - saturate the red channel under the mask (the classic look)
+#   fill     - paint the mask with `color`, blended by `alpha`
+#   contour  - only draw the mask outline in `color`
+
+import cv2
+import numpy as np
+
+MODES = ('tint', 'fill', 'contour')
+
+
+class MaskOverlay:
+    def __init__(self, mode='tint', color=(0, 0, 255), alpha=1.0, threshold=0, thickness=2):
+        assert mode in MODES, f"Unknown mask overlay mode '{mode}', choose from {MODES}"
+        assert 0.0 <= alpha <= 1.0, f"Mask alpha must be in 0..1, got {alpha}"
+        self.mode = mode
+        self.color = tuple(int(c) for c in color)
+        self.alpha = alpha
+        self.threshold = threshold
+        self.thickness = thickness
+        self._shape = None
+
+    def _alloc(self, shape):
+        h, w = shape[:2]
+        self._shape = shape
+        self._fg = np.empty((h, w), dtype=np.uint8)
+        self._solid = np.empty((h, w, 3), dtype=np.uint8)
+        self._solid[:] = self.color
+        self._blend = np.empty((h, w, 3), dtype=np.uint8)
+
+    def apply(self, frame, mask):
+        # frame: HxWx3 uint8, modified in place; mask: HxW uint8
+        if mask.ndim == 3:
+            mask = mask[:, :, 0]
+        assert mask.shape == frame.shape[:2], \
+            f"Mask size {mask.shape[::-1]} does not match frame size {frame.shape[1::-1]}"
+
+        if frame.shape != self._shape:
+            self._alloc(frame.shape)
+
+        # cv2 treats any non-zero mask pixel as set, so only threshold when needed
+        if self.threshold > 0:
+            cv2.threshold(mask, self.threshold, 255, cv2.THRESH_BINARY, dst=self._fg)
+            mask = self._fg
+
+        if self.mode == 'tint':
+            cv2.bitwise_or(frame, (0, 0, 255, 0), dst=frame, mask=mask)
+        elif self.mode == 'contour':
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            cv2.drawContours(frame, contours, -1, self.color, self.thickness)
+        elif self.alpha >= 1.0:
+            cv2.copyTo(self._solid, mask, frame)
+        else:
+            cv2.addWeighted(frame, 1.0 - self.alpha, self._solid, self.alpha, 0.0, dst=self._blend)
+            cv2.copyTo(self._blend, mask, frame)
+
+        return frame
+
+
+def parse_color(text):
+    # "B,G,R" -> (B, G, R)
+    color = tuple(int(c) for c in text.split(','))
+    assert len(color) == 3 and all(0 <= c <= 255 for c in color), \
+        f"Mask colour must be given as B,G,R in 0..255, got '{text}'"
+    return color
+
+
+def add_overlay_args(parser):
+    # common command line options for scripts that overlay masks
+    parser.add_argument('--mask_mode', type=str, default='tint', choices=MODES,
+                        help="mask overlay style (default=tint)")
+    parser.add_argument('--mask_color', type=parse_color, default=(0, 0, 255),
+                        help="mask overlay colour as B,G,R (default=0,0,255)")
+    parser.add_argument('--mask_alpha', type=float, default=1.0,
+                        help="mask overlay opacity 0..1 for 'fill' mode (default=1.0)")
+    parser.add_argument('--mask_threshold', type=int, default=0,
+                        help="mask pixels above this value are foreground (default=0)")
+    return parser
+
+
+def overlay_from_args(args):
+    return MaskOverlay(mode=args.mask_mode, color=args.mask_color,
+                       alpha=args.mask_alpha, threshold=args.mask_threshold)
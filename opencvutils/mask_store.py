@@ -0,0 +1,137 @@
+# Compact binary mask store
+#
+# A mask sequence is kept as one file (<maskdir>.masks) instead of a
+# directory of full-colour JPG/PNG images. Each mask is thresholded once at
+# import (which also removes JPEG ringing that `mask > 0` would pick up),
+# bit-packed (8 pixels per byte) and deflate-compressed, which is close to
+# run-length coding for the large uniform areas of a mask. A table of frame
+# offsets in the header gives random access to any frame, and the file is
+# memory-mapped, so reading a mask is one decompress + unpack:
+#
+#   header   - magic, version, n_frames, height, width      ('<8sIIII')
+#   offsets  - n_frames + 1 uint64 file offsets of the frame records
+#   records  - zlib(np.packbits(mask > threshold)) per frame
+#
+# Import a mask directory from the command line:
+#   python -m opencvutils.mask_store --maskdir clip_masks            (-> clip_masks.masks)
+
+import os
+import cv2
+import mmap
+import zlib
+import struct
+import argparse
+import numpy as np
+from .frame_index import FrameIndex
+from .frame_decode import decode_frames, add_decode_args
+
+MAGIC = b'CVMASKS\n'
+STORE_VERSION = 1
+HEADER = struct.Struct('<8sIIII')
+EXT = '.masks'
+
+
+def is_mask_store(path):
+    return path is not None and os.path.isfile(path) and path.endswith(EXT)
+
+
+def pack_mask(mask, threshold=127):
+    # HxW (or HxWxC, first channel used) -> compressed bit-packed record
+    if mask.ndim == 3:
+        mask = mask[:, :, 0]
+    return zlib.compress(np.packbits(mask > threshold).tobytes(), 1)
+
+
+def import_masks(maskdir, outfile=None, threshold=127, **decode_kw):
+    # packs all masks of maskdir into one store file, returns the opened MaskStore
+    outfile = outfile or maskdir.rstrip(os.sep) + EXT
+    files = FrameIndex(maskdir)
+    n = len(files)
+
+    partial = outfile + '.partial'
+    with open(partial, 'wb') as f:
+        f.seek(HEADER.size + 8 * (n + 1))  # header and offsets are written last
+        offsets = [f.tell()]
+        shape = None
+        for mask in decode_frames(files, flags=cv2.IMREAD_GRAYSCALE, **decode_kw):
+            if shape is None:
+                shape = mask.shape
+            assert mask.shape == shape, f"Mask size {mask.shape} differs from {shape} in {maskdir}"
+            f.write(pack_mask(mask, threshold))
+            offsets.append(f.tell())
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, STORE_VERSION, n, shape[0], shape[1]))
+        f.write(np.asarray(offsets, dtype='<u8').tobytes())
+    os.replace(partial, outfile)
+
+    return MaskStore(outfile)
+
+
+class MaskStore:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.n_frames, self.height, self.width = HEADER.unpack_from(self.mm, 0)
+        assert magic == MAGIC and version == STORE_VERSION, f"Not a mask store (version {STORE_VERSION}): {path}"
+        self.offsets = np.frombuffer(self.mm, dtype='<u8', count=self.n_frames + 1, offset=HEADER.size)
+
+    @property
+    def shape(self):
+        return (self.height, self.width)
+
+    @property
+    def nbytes(self):
+        return int(self.offsets[-1])
+
+    def __len__(self):
+        return self.n_frames
+
+    def get(self, i, dtype=np.uint8):
+        # mask of frame i: uint8 (0/255) or bool HxW array
+        if i < 0:
+            i += self.n_frames
+        if not 0 <= i < self.n_frames:
+            raise IndexError(f"mask {i} out of range for {self.n_frames} masks in {self.path}")
+        packed = zlib.decompress(self.mm[self.offsets[i]:self.offsets[i + 1]])
+        bits = np.unpackbits(np.frombuffer(packed, np.uint8), count=self.height * self.width)
+        bits = bits.reshape(self.height, self.width)
+        if dtype == bool:
+            return bits.view(bool)
+        bits *= 255
+        return bits
+
+    def __getitem__(self, i):
+        return self.get(i)
+
+    def frames(self, startframe=0, finishframe=None, reverse=False, dtype=np.uint8):
+        order = range(startframe, finishframe if finishframe is not None else self.n_frames)
+        for i in reversed(order) if reverse else order:
+            yield self.get(i, dtype)
+
+    def close(self):
+        self.offsets = None
+        self.mm.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m opencvutils.mask_store')
+    parser.add_argument('--maskdir', type=str, required=True,
+                        help="mask directory (*.jpg or *.png) to import")
+    parser.add_argument('--output', type=str, default=None,
+                        help=f"mask store file (default = mask directory + '{EXT}')")
+    parser.add_argument('--threshold', type=int, default=127,
+                        help="mask pixels above this value are set (default=127)")
+    add_decode_args(parser)
+    args = parser.parse_args()
+
+    store = import_masks(args.maskdir, args.output, args.threshold, workers=args.workers,
+                         prefetch=args.prefetch, use_processes=args.decode_processes)
+
+    src_bytes = sum(os.path.getsize(f) for f in FrameIndex(args.maskdir))
+    print(f"Imported {len(store)} masks of {store.width}x{store.height} into {store.path}")
+    print(f"{src_bytes / 2**20:.2f} MB of image files -> {store.nbytes / 2**20:.2f} MB "
+          f"({src_bytes / max(store.nbytes, 1):.1f}x smaller)")
+    print("\nCompleted successfully")
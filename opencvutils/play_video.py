@@ -0,0 +1,685 @@
+import os
+import cv2
+import argparse
+import warnings
+import numpy as np
+from itertools import repeat
+from time import time
+from .frame_decode import decode_frames, add_decode_args
+from .video_probe import VideoProbe
+from .frame_index import is_frame_list
+from .playback import ReadAhead, Pacer
+from .mask_overlay import add_overlay_args, overlay_from_args
+from .seek_index import SeekIndex
+from .frame_lru import FrameLRU, SequentialSource
+from .stage_timer import add_profile_args, timer_from_args
+from .video_encoder import VideoEncoder, add_encoder_args, encoder_kw_from_args, QUEUE_SIZE
+from .proxy import Proxy, DEFAULT_HEIGHT
+from .reverse import reverse_video_frames
+from .mask_store import MaskStore, is_mask_store
+from .frame_transform import FramePipeline, rotation_from_args
+
+if cv2.__version__ < '4.1.0':
+    warnings.warn("cv2 version < 4.1.0, script not tested for earlier versions",
+                  UserWarning)
+
+
+def parse_args(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog)
+
+    parser.add_argument('--infile', type=str, required=None, 
+                        help="input file in .mp4, .avi, .mov, or .mkv format, a frame directory "
+                             "or a frame list (.txt, see opencvutils reverse --mode manifest)")
+
+    parser.add_argument('--maskdir', type=str, required=None, 
+                        help="mask directory (*.jpg or *.png), frame list (.txt) or mask store "
+                             "(.masks, see python -m opencvutils.mask_store), "
+                             "total must be same as frame count")
+
+    parser.add_argument('--fps', type=int, default=None, 
+                        help="video replay frame rate, frames per second (default=60 fps)")
+
+    parser.add_argument('--rotate_right', action='store_true', 
+                        help="Rotate image by 90 deg clockwise")
+
+    parser.add_argument('--rotate_left', action='store_true', 
+                        help="Rotate image by 90 deg anticlockwise")
+
+    parser.add_argument('--frame_num', action='store_true', 
+                        help="display frame number")
+
+    parser.add_argument('--start', type=int, default= 0, help="start from frame#")
+
+    parser.add_argument('--finish', type=int, default= None, help="finish at frame#")
+
+    parser.add_argument('--outvideo', type=str, default = None, 
+                        help="Output selected sequence to video (.mp4, .avi, .mov, .mkv), encoded by ffmpeg")
+                    
+    parser.add_argument('--outgif', type=str, default = None, 
+                        help="Output selected sequence to gif (.gif)")
+
+    parser.add_argument('--gif_scale', type=float, default=1.0, 
+                        help="scale factor for gif frames, e.g. 0.5 for half size (default=1.0)")
+
+    parser.add_argument('--gif_skip', type=int, default=1, 
+                        help="keep only every n-th frame in the gif (default=1)")
+
+    parser.add_argument('--gif_shared_palette', action='store_true', 
+                        help="use the first frame's palette for all gif frames (smaller file)")
+
+    parser.add_argument('--headless', action='store_true', 
+                        help="render --outvideo/--outgif as fast as possible, without a window or pacing")
+
+    parser.add_argument('--info', action='store_true', 
+                        help="output video information")
+
+    parser.add_argument('--readahead', type=int, default=16, 
+                        help="number of frames decoded ahead of display (default=16)")
+
+    parser.add_argument('--drop_late', action='store_true', 
+                        help="skip frames that are already late to keep the target frame rate")
+
+    parser.add_argument('--seek_index', action='store_true', 
+                        help="index keyframes (kept in a sidecar file) for fast, exact --start and frame count")
+
+    parser.add_argument('--cache', type=str, default=None, 
+                        help="raw frame cache directory, built on first use (see python -m opencvutils.raw_cache)")
+
+    parser.add_argument('--lru_mb', type=int, default=512, 
+                        help="memory budget in MB for decoded frames kept for restart/stepping (default=512, 0=off)")
+
+    parser.add_argument('--lru_rendered', action='store_true', 
+                        help="keep fully rendered frames (mask, rotation, label) in the frame cache")
+
+    parser.add_argument('--probe_cache', action='store_true', 
+                        help="keep probed video information in a sidecar file next to the input")
+
+    parser.add_argument('--proxy', action='store_true', 
+                        help="play from low-resolution proxies (built in the background when missing), "
+                             "--outvideo/--outgif still render from full resolution")
+
+    parser.add_argument('--reverse', action='store_true', 
+                        help="play (and write) the selected sequence backwards")
+
+    parser.add_argument('--proxy_height', type=int, default=DEFAULT_HEIGHT, 
+                        help=f"frame height of the proxies (default={DEFAULT_HEIGHT})")
+
+    parser.add_argument('--grid', type=str, nargs='+', default=None, 
+                        help="more videos or frame directories, played in sync with --infile in one tiled window")
+
+    parser.add_argument('--grid_cols', type=int, default=None, 
+                        help="number of tile columns with --grid (default=as square as possible)")
+
+    parser.add_argument('--grid_scale', type=float, default=1.0, 
+                        help="tile size relative to the --infile frame size with --grid (default=1.0)")
+
+    add_decode_args(parser)
+    add_encoder_args(parser)
+    add_overlay_args(parser)
+    add_profile_args(parser)
+
+    parser.add_argument('other', nargs=argparse.REMAINDER) # catch unnamed arguments
+
+    return parser.parse_args(argv)
+
+
+##### Helper functions #####
+def get_frame(vfile, n_frames, startframe=0, finishframe=None, probe=None, seek_index=None,
+              reverse=False, **decode_kw):
+    # probe: optional VideoProbe of vfile, reuses its frame list / open capture
+    # seek_index: optional SeekIndex of vfile, for exact keyframe seeking
+    # reverse: yield finishframe-1 down to startframe (videos: decoded in GOP chunks)
+    if probe is None:
+        probe = VideoProbe(vfile)
+
+    if probe.isdir:
+        images = probe.files
+
+        assert len(images) == n_frames, \
+            f"Mismatch in number of mask files versus number of frames\n" + \
+            f"n_frames={n_frames}, n_masks={len(images)}"
+
+        if finishframe is None:
+            finishframe = n_frames        
+
+        images = images[startframe:finishframe]
+        if reverse:
+            images = images[::-1]
+
+        yield from decode_frames(images, **decode_kw)
+
+    elif reverse:
+        probe.release()
+        yield from reverse_video_frames(vfile, startframe, finishframe or n_frames, seek_index)
+
+    else:
+        cap = probe.capture()
+
+        # start frame is indexed
+        # stop frame is set by controlling loop (caller)
+        if seek_index is not None:
+            seek_index.seek(cap, startframe)
+        elif startframe != 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, startframe)
+        
+        while True:
+            ret, frame = cap.read()
+            
+            if ret:
+                yield frame
+            else:
+                cap.release()
+                break
+
+def get_mask(maskdir,n_frames, startframe=0, finishframe=None, probe=None, reverse=False, **decode_kw):
+    if is_mask_store(maskdir):
+        store = probe if isinstance(probe, MaskStore) else MaskStore(maskdir)
+        assert len(store) == n_frames, \
+            f"Mismatch in number of masks versus number of frames\n" + \
+            f"n_frames={n_frames}, n_masks={len(store)}"
+        yield from store.frames(startframe, finishframe, reverse)
+        return
+
+    assert os.path.isdir(maskdir) or is_frame_list(maskdir), \
+        f"Use masks specified, however supplied path was not a directory or frame list:\n{maskdir}"
+
+    if probe is None:
+        probe = VideoProbe(maskdir)
+
+    images = probe.files
+    assert len(images) == n_frames, \
+        f"Mismatch in number of mask files versus number of frames\n" + \
+        f"n_frames={n_frames}, n_masks={len(images)}"
+    
+    if finishframe is None:
+        finishframe = n_frames
+    
+    images = images[startframe:finishframe]
+    if reverse:
+        images = images[::-1]
+
+    # masks are decoded single-channel
+    yield from decode_frames(images, flags=cv2.IMREAD_GRAYSCALE, **decode_kw)
+
+
+def write_outputs(outvid, outgif, frame, i, timer, copy=True):
+    # hands frame i to the video and gif outputs (either may be None)
+    # copy=False: frame is not drawn on again, the encoder queues it as is
+    if outvid is not None:
+        with timer.stage('encode_queue', i):
+            outvid.write(frame, i, copy=copy)
+    if outgif is not None:
+        with timer.stage('gif', i):
+            outgif.write(frame)
+
+
+def close_outputs(args, outvid, outgif):
+    # finishes the outputs of a pass
+    if outvid is not None:
+        outvid.close()
+        print(f"Successfully wrote {outvid.n_written} frames to videofile file as={args.outvideo}") 
+    if outgif is not None:
+        outgif.close()
+        print(f"Successfully wrote {outgif.n_written} frames to .gif file as={args.outgif} "
+              f"(encode time {outgif.encode_time:.2f}s)") 
+
+
+def wait_keys(pacer, paused, i, timer, writing=False, stepping=True, at_start=False):
+    # waits out the rest of the frame period (or for a key while paused) and handles
+    # the keys: p=pause/resume, b/f=step back/forward (pauses), q=quit, e=end, r=restart
+    # writing: outputs are open (no stepping, quitting or rewinding)
+    # stepping: b/f are available; at_start: no stepping back
+    # returns (step, paused, replay): step is the move to the next frame position, or None
+    # to leave the pass; replay is the new replay flag, or None if unchanged
+    replay = None
+    step = None
+    while step is None:
+        with timer.stage('wait', i):
+            keycode = cv2.waitKey(0) if paused else pacer.wait_key()
+        key = keycode & 0xFF
+        step = 0 if paused else 1
+
+        if key == ord('p'):  # pause / resume
+            paused = not paused
+            step = 0 if paused else 1
+            pacer.reset()
+        elif stepping and key in (ord('b'), ord('f')):  # single-frame step
+            if writing:
+                print("Cannot step now..writing video. Try on next loop")
+            else:
+                paused = True
+                step = -1 if key == ord('b') else 1
+                if step < 0 and at_start:
+                    step = 0
+        elif key == ord('q'):  # quit (immediately)
+            if writing:
+                print("Cannot stop now..writing video. Try on next loop")
+            else:
+                return None, paused, 0
+        elif key == ord('e'):  # end (eventually)
+            replay = 0
+        elif key == ord('r'):  # restart
+            if writing:
+                print("Cannot rewind now..writing video. Try on next loop")
+            else:
+                return None, paused, 1
+
+        if paused and step == 0:
+            step = None  # keep waiting on this frame
+    return step, paused, replay
+
+
+def print_info(n_frames, size, i_frames, elapsed, pacer):
+    print(f"Number of frames: {n_frames}")
+    print(f"Width x height = ({size[0]},{size[1]})")
+    print(f"Actual replay speed = {i_frames / elapsed if elapsed > 0 else 0:.3f}/s")
+    print(f"Dropped late frames = {pacer.n_dropped}")
+        
+
+def main(args):
+
+    if args.infile:
+        vfile = args.infile 
+    elif args.other:
+        vfile = args.other[0]
+    else:
+        assert False,"No input file was specified"
+
+    assert os.path.exists(vfile), f"Input file was not found: {vfile}"
+
+    probe = VideoProbe(vfile, cache=args.probe_cache)
+    if not probe.isdir:
+        print(f"File spec FPS ={probe.fps}")
+        print(f"File spec vcodec ={probe.fourcc}")
+        print(f"File spec n_frames ={probe.n_frames}")
+
+    if args.fps is not None:
+        fps = args.fps
+    else:
+        fps = probe.fps
+        if not fps:
+            fps = 60 
+    
+    # the grid decodes every stream itself: drop these before any index, cache or proxy is built
+    if args.grid and (args.proxy or args.cache or args.reverse):
+        print("--proxy, --cache and --reverse are ignored with --grid")
+        args.proxy, args.cache, args.reverse = False, None, False
+
+    n_frames = probe.n_frames
+    seek_index = None
+    # exact frame count from the packet index (raw caches and proxies hold every decoded frame)
+    if (args.seek_index or args.reverse or args.cache or args.proxy) and not probe.isdir:
+        seek_index = SeekIndex(vfile)
+        if seek_index.n_frames != n_frames:
+            print(f"Indexed n_frames ={seek_index.n_frames} (container reported {n_frames})")
+        n_frames = seek_index.n_frames
+    width,height = probe.size
+    if is_mask_store(args.maskdir):
+        mask_probe = MaskStore(args.maskdir)
+    else:
+        mask_probe = VideoProbe(args.maskdir, cache=args.probe_cache) if args.maskdir else None
+
+    startframe = 0
+    if args.start:
+        assert abs(args.start) < n_frames, \
+            f"Invalid 'start'={startframe} frame specified, exceeds number of frames ({n_frames})"
+
+        startframe = args.start if args.start >= 0 else n_frames + args.start  # negative indicates from end
+    
+    finishframe = n_frames
+    if args.finish is not None:
+        assert abs(args.finish) < n_frames, \
+            f"Invalid 'finish'={finishframe} frame specified, exceeds number of frames({n_frames})"
+
+        finishframe = args.finish if args.finish >= 0 else n_frames + args.finish  # negative indicates from end 
+    
+    assert finishframe > startframe, f"Invalid definition of 'start'={startframe} and 'finish'={finishframe}, start > finish"
+
+    decode_kw = dict(workers=args.workers, prefetch=args.prefetch,
+                     use_processes=args.decode_processes)
+
+    overlay = overlay_from_args(args)
+    timer = timer_from_args(args)
+
+    # replay from memory-mapped raw frames instead of decoding?
+    cache = None
+    if args.cache:
+        from .raw_cache import open_cache
+        cache = open_cache(vfile, args.cache, args.maskdir, **decode_kw)
+        if cache.n_frames < n_frames:
+            # the source decoded fewer frames than indexed, the cache holds what it delivered
+            print(f"Raw frame cache has {cache.n_frames} frames (indexed {n_frames}), "
+                  f"playing the cached frames")
+            n_frames = cache.n_frames
+            finishframe = min(finishframe, n_frames)
+            assert finishframe > startframe, \
+                f"Invalid 'start'={startframe} frame specified, the cache has {n_frames} frames"
+        if args.maskdir:
+            assert cache.masks is not None and len(cache.masks) == cache.n_frames, \
+                f"Raw frame cache {args.cache} does not hold a mask for each of its {cache.n_frames} frames"
+    workbufs = {}
+
+    # play from low-resolution proxies? (exports are rendered from the source)
+    proxy = proxy_mask = None
+    if args.proxy and args.headless:
+        print("--proxy is ignored with --headless, rendering from full resolution")
+    elif args.proxy and is_mask_store(args.maskdir):
+        print("--proxy is not available with a mask store, playing full resolution")
+    elif args.proxy:
+        proxy = Proxy(vfile, args.proxy_height)
+        proxy_mask = Proxy(args.maskdir, args.proxy_height, mask=True) if args.maskdir else None
+        missing = [p for p in (proxy, proxy_mask) if p is not None and not p.ready]
+        for p in missing:
+            p.build_in_background()
+        if missing:
+            print("Building proxies in the background, playing full resolution this time")
+            proxy = proxy_mask = None
+        elif proxy.n_frames != n_frames:
+            print(f"Proxy has {proxy.n_frames} frames, expected {n_frames}: playing full resolution")
+            proxy = proxy_mask = None
+        else:
+            proxy_probe = VideoProbe(proxy.path)
+            proxy_mask_probe = VideoProbe(proxy_mask.path) if proxy_mask else None
+            print(f"Playing from {proxy.size[0]}x{proxy.size[1]} proxy")
+
+    replay = 1 
+
+    # Write out edited video file?
+    # (ffmpeg on a writer thread, the frame size is taken from the first rendered frame)
+    outvid = None
+    if args.outvideo:
+        outvideofile = args.outvideo
+        assert os.path.splitext(outvideofile)[1].lower() in ('.mp4', '.avi', '.mov', '.mkv'), \
+            f"Could not determine the video output type from {outvideofile}"
+        outvid = VideoEncoder(outvideofile, fps, timer=timer, **encoder_kw_from_args(args))
+
+    # Write out edited GIF file?
+    outgif = None
+    if args.outgif:
+        from .gif_writer import GifWriter  # PIL is only needed here
+        outgif = GifWriter(args.outgif, fps, scale=args.gif_scale, skip=args.gif_skip,
+                           shared_palette=args.gif_shared_palette)
+
+    def source_frame(i):
+        # display position -> source frame number (they differ with --reverse)
+        return startframe + finishframe - 1 - i if args.reverse else i
+
+    def open_reader(first, full=False):
+        # background reader of (i, frame, mask) from display position `first` on
+        # full: always read the full-resolution source, even when playing from proxies
+        lo, hi = (startframe, source_frame(first) + 1) if args.reverse else (first, finishframe)
+        if proxy is not None and not full:
+            # intra-only proxy, plain frame seeking is exact
+            frame_gen = get_frame(proxy.path, n_frames, lo, hi, proxy_probe, None, args.reverse, **decode_kw)
+            mask_gen = get_mask(proxy_mask.path, n_frames, lo, hi, proxy_mask_probe, args.reverse, **decode_kw) if proxy_mask else None
+        elif cache is not None:
+            if args.reverse:
+                frame_gen = (cache.frames[j] for j in reversed(range(lo, hi)))
+                mask_gen = (cache.masks[j] for j in reversed(range(lo, hi))) if args.maskdir else None
+            else:
+                frame_gen = cache.get_frame(lo, hi)
+                mask_gen = cache.get_mask(lo, hi) if args.maskdir else None
+        else:
+            frame_gen = get_frame(vfile, n_frames, lo, hi, probe, seek_index, args.reverse, **decode_kw)
+            mask_gen = get_mask(args.maskdir,n_frames, lo, hi, mask_probe, args.reverse, **decode_kw) if args.maskdir else None
+
+        frame_gen = timer.timed('decode', frame_gen, first)
+        if mask_gen is not None:
+            mask_gen = timer.timed('mask_read', mask_gen, first)
+
+        # decode (frame, mask) pairs on a background thread ahead of display
+        sources = zip(range(first,finishframe), frame_gen, mask_gen if mask_gen else repeat(None))
+        return ReadAhead(sources, size=args.readahead)
+
+    def writable(frame, key='display'):
+        # read-only views (raw frame cache, frame LRU) are drawn on a reused copy,
+        # one per key (display / export)
+        if frame.flags.writeable:
+            return frame
+        workbuf = workbufs.get(key)
+        if workbuf is None or workbuf.shape != frame.shape:
+            workbuf = workbufs[key] = np.empty_like(frame)
+        np.copyto(workbuf, frame)
+        return workbuf
+
+    def reused(frame):
+        # True for the work copies above, which are drawn on again for the next frame;
+        # pipeline buffers, freshly decoded frames and read-only LRU frames are not
+        return any(frame is workbuf for workbuf in workbufs.values())
+
+    # mask overlay -> rotate -> frame number, rotated frames go into reused buffers
+    # (separate pipelines and overlays: with --proxy display and export frames differ
+    # in size, and each overlay keeps scratch buffers of its frame size)
+    # frames for the encoder are queued without a copy, so the pipeline feeding it
+    # cycles through enough buffers to cover the queue
+    encode_buffers = QUEUE_SIZE + 2 if args.outvideo else 1
+    pipeline = FramePipeline(rotate=rotation_from_args(args), label=args.frame_num, overlay=overlay,
+                             buffers=1 if proxy is not None else encode_buffers, timer=timer)
+    export_pipeline = FramePipeline(rotate=rotation_from_args(args), label=args.frame_num,
+                                    overlay=overlay_from_args(args), buffers=encode_buffers, timer=timer)
+
+    if args.grid:
+        # all streams tiled into one preallocated canvas: every stream decodes, overlays
+        # and scales on its own read-ahead thread, the display thread takes frame i
+        # from each stream (so they stay aligned by index) and paces the canvas
+        from .grid_view import GridCanvas, grid_tiles
+        assert not args.headless or outvid is not None or outgif is not None, \
+            "--headless needs an output (--outvideo and/or --outgif)"
+        inputs = [vfile] + args.grid
+        probes = [probe] + [VideoProbe(f, cache=args.probe_cache) for f in args.grid]
+        for f, p in zip(inputs, probes):
+            assert p.n_frames, f"Could not determine the frame count of {f}"
+        finishframe = min([finishframe] + [p.n_frames for p in probes[1:]])
+        assert finishframe > startframe, f"Grid inputs have fewer than 'start'={startframe} frames"
+
+        rotate = rotation_from_args(args)
+        tile_w, tile_h = (height, width) if rotate is not None else (width, height)
+        tile_size = (max(2, round(tile_w * args.grid_scale)), max(2, round(tile_h * args.grid_scale)))
+        canvas = GridCanvas(len(inputs), tile_size, args.grid_cols)
+        print(f"Grid of {len(inputs)} streams, {canvas.rows}x{canvas.cols} tiles of "
+              f"{tile_size[0]}x{tile_size[1]}, frames {startframe}-{finishframe - 1}")
+
+        def open_grid(first):
+            readers = []
+            for k, (f, p) in enumerate(zip(inputs, probes)):
+                frame_gen = get_frame(f, p.n_frames, first, finishframe, p,
+                                      seek_index if k == 0 else None, **decode_kw)
+                mask_gen = None
+                if k == 0 and args.maskdir:  # the mask is overlaid on the first stream only
+                    mask_gen = get_mask(args.maskdir, n_frames, first, finishframe, mask_probe, **decode_kw)
+                tiles = grid_tiles(timer.timed(f'decode{k}', frame_gen, first), tile_size, first,
+                                   rotate, mask_gen, overlay, buffers=args.readahead + 3)
+                readers.append(ReadAhead(tiles, size=args.readahead))
+            return readers
+
+        def grid_frame(streams, i, compose=True):
+            # composes frame i of all streams (only takes it with compose=False),
+            # None when a stream ended early
+            for k, stream in enumerate(streams):
+                item = next(stream, None)
+                if item is None:
+                    return None
+                j, tile = item
+                assert j == i, f"Stream {inputs[k]} delivered frame {j}, expected {i}"
+                if compose:
+                    with timer.stage('compose', i):
+                        canvas.put(k, tile)
+            if args.frame_num and compose:
+                with timer.stage('label', i):
+                    pipeline.draw_label(canvas.tiles[0], i)
+            return canvas.image
+
+        # frames are never dropped while writing output files
+        pacer = Pacer(fps, drop_late=args.drop_late and not (args.outvideo or args.outgif))
+        paused = False
+        while replay:
+            start = time()
+            pacer.reset()
+            readers = open_grid(startframe)
+            streams = [iter(reader) for reader in readers]
+            i_frames = 0
+            for i in range(startframe, finishframe):
+                if not paused and pacer.drop_late and pacer.is_late():
+                    if grid_frame(streams, i, compose=False) is None:
+                        break
+                    pacer.skip()
+                    timer.count('dropped')
+                    continue
+
+                frame = grid_frame(streams, i)
+                if frame is None:
+                    break
+                write_outputs(outvid, outgif, frame, i, timer)  # copied, the canvas is reused
+                i_frames += 1
+                if args.headless:
+                    continue
+
+                if not paused and pacer.is_late():
+                    timer.count('late')
+                with timer.stage('display', i):
+                    cv2.imshow('frame', frame)
+
+                step, paused, replay_key = wait_keys(pacer, paused, i, timer, stepping=False,
+                                                     writing=outvid is not None or outgif is not None)
+                if replay_key is not None:
+                    replay = replay_key
+                if step is None:
+                    break
+
+            for reader in readers:
+                reader.stop()
+            close_outputs(args, outvid, outgif)
+            outvid = outgif = None
+            if args.headless:
+                replay = 0
+
+        elapsed = time() - start
+        if args.headless or args.info:
+            print(f"Played {i_frames} frames of {len(inputs)} streams in {elapsed:.2f}s "
+                  f"({i_frames / elapsed:.1f} frames/s)")
+        if not args.headless:
+            cv2.destroyAllWindows()
+            if args.info:
+                print_info(finishframe - startframe, canvas.image.shape[1::-1], i_frames, elapsed, pacer)
+        timer.report(args.trace)
+        return
+
+    if args.headless:
+        # decode -> mask -> rotate -> label -> encode, no window and no pacing
+        assert outvid is not None or outgif is not None, \
+            "--headless needs an output (--outvideo and/or --outgif)"
+
+        start = time()
+        i_frames = 0
+        reader = open_reader(startframe)
+        for i, frame, mask in reader:
+            frame = pipeline(writable(frame), mask, source_frame(i))
+            write_outputs(outvid, outgif, frame, i, timer, copy=reused(frame))
+            i_frames += 1
+        reader.stop()
+        close_outputs(args, outvid, outgif)
+
+        elapsed = time() - start
+        print(f"Rendered {i_frames} frames in {elapsed:.2f}s ({i_frames / elapsed:.1f} frames/s)")
+        timer.report(args.trace)
+        return
+
+    # decoded frames (or rendered frames with --lru_rendered) are kept for restart/stepping
+    lru = FrameLRU(args.lru_mb * 2**20) if args.lru_mb > 0 else None
+    source = SequentialSource(open_reader, None if args.lru_rendered else lru)
+
+    # frames are never dropped while writing output files
+    pacer = Pacer(fps, drop_late=args.drop_late and not (args.outvideo or args.outgif))
+    paused = False
+
+    while replay:
+        start = time()
+        pacer.reset()
+        next_write = startframe  # outputs get each frame once, even when stepping
+
+        # with proxies the outputs get their frames from a full-resolution reader
+        exporter = None
+        if proxy is not None and (outvid is not None or outgif is not None):
+            exporter = open_reader(startframe, full=True)
+            export_items = iter(exporter)
+
+        i_frames = 0
+        i = startframe
+        while i < finishframe:
+            rendered = lru.get(i) if lru is not None and args.lru_rendered else None
+
+            if rendered is not None:
+                frame = rendered[0]
+            else:
+                if not paused and pacer.drop_late and pacer.is_late():
+                    pacer.skip()
+                    timer.count('dropped')
+                    i += 1
+                    continue
+
+                item = source.get(i)
+                if item is None:
+                    print(f"Source ended at frame {i}, before the finish frame {finishframe}")
+                    finishframe = i
+                    break
+                frame, mask = item
+                frame = pipeline(writable(frame), mask, source_frame(i))
+
+                if lru is not None and args.lru_rendered:
+                    lru.put(i, (frame.copy(),))
+
+            if i == next_write:
+                out_frame = frame
+                if exporter is not None:
+                    j, full_frame, full_mask = next(export_items)
+                    out_frame = export_pipeline(writable(full_frame, 'export'), full_mask, source_frame(j))
+
+                ### optional: write video / gif of frames
+                write_outputs(outvid, outgif, out_frame, i, timer, copy=reused(out_frame))
+                next_write += 1
+
+            ### show image
+            if not paused and pacer.is_late():
+                timer.count('late')
+            with timer.stage('display', i):
+                cv2.imshow('frame',frame)
+            i_frames += 1
+
+            ### look for a way out (waits out the rest of the frame period)
+            step, paused, replay_key = wait_keys(pacer, paused, i, timer, at_start=i <= startframe,
+                                                 writing=outvid is not None or outgif is not None)
+            if replay_key is not None:
+                replay = replay_key
+            if step is None:
+                break  # leave the frame loop
+            i += step
+
+        if finishframe <= startframe:
+            replay = 0  # nothing left to play
+
+        if exporter is not None:
+            exporter.stop()
+            exporter = None
+
+        # close video / gif outputs if open
+        close_outputs(args, outvid, outgif)
+        outvid = outgif = None
+
+        # End While loop
+
+    source.stop()
+    cv2.destroyAllWindows()
+
+    if args.info:
+        print_info(n_frames, (width, height), i_frames, time() - start, pacer)
+        if proxy is not None:
+            print(f"Played from proxy {proxy.path} ({proxy.size[0]}x{proxy.size[1]})")
+        if lru is not None:
+            print(f"Frame cache hit rate = {100 * lru.hit_rate:.1f}% "
+                  f"({lru.hits} hits, {lru.misses} misses, {lru.nbytes / 2**20:.0f} MB used)")
+
+    timer.report(args.trace)
+
+
+if __name__ == '__main__':
+    main(parse_args())
@@ -0,0 +1,113 @@
+# Playback helpers: background read-ahead and drift-free frame pacing
+#
+# ReadAhead runs a frame iterator on its own thread and buffers up to
+# `size` items in a bounded queue, so a slow decode only stalls the display
+# once the buffer has run dry. Pacer schedules each frame against an
+# absolute deadline (start + (n+1) * spf) and does its waiting inside
+# cv2.waitKey, so the time spent polling the keyboard is part of the frame
+# period instead of being added on top of it.
+
+import cv2
+import threading
+from queue import Queue, Empty, Full
+from time import perf_counter
+
+_END = object()
+
+
+class ReadAhead:
+    def __init__(self, source, size=8):
+        self.queue = Queue(maxsize=max(size, 1))
+        self.error = None
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._fill, args=(source,), daemon=True)
+        self.thread.start()
+
+    def _put(self, item):
+        # blocking put that gives up once the reader is stopped
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def _fill(self, source):
+        try:
+            for item in source:
+                if not self._put(item):
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            if hasattr(source, 'close'):
+                source.close()
+            self._put(_END)
+
+    def __iter__(self):
+        while True:
+            item = self.queue.get()
+            if item is _END:
+                break
+            yield item
+        if self.error is not None:
+            raise self.error
+
+    def stop(self):
+        self._stop.set()
+        # unblock a producer waiting on a full queue
+        try:
+            while True:
+                self.queue.get_nowait()
+        except Empty:
+            pass
+        self.thread.join()
+
+
+class Pacer:
+    def __init__(self, fps, drop_late=False):
+        self.spf = 1.0 / fps
+        self.drop_late = drop_late
+        self.n_shown = 0
+        self.n_dropped = 0
+        self.reset()
+
+    def reset(self):
+        # restart the schedule, e.g. after a pause
+        self.start = perf_counter()
+        self.n_slot = 0
+
+    @property
+    def deadline(self):
+        # end of the current frame's display slot
+        return self.start + (self.n_slot + 1) * self.spf
+
+    def is_late(self):
+        # True if the current slot has already passed before the frame was shown
+        return perf_counter() > self.deadline
+
+    def skip(self):
+        # give up the current slot without showing a frame
+        self.n_slot += 1
+        self.n_dropped += 1
+
+    def advance(self):
+        # for event loops that schedule their own timers (e.g. Tk after()):
+        # marks the current slot as shown, returns the seconds left until its deadline
+        remaining = self.deadline - perf_counter()
+        self.n_slot += 1
+        self.n_shown += 1
+        return remaining
+
+    def wait_key(self):
+        # call after imshow: waits out the rest of the slot inside cv2.waitKey
+        # (at least 1 ms, so the window gets to process events), returns the key code
+        remaining = self.deadline - perf_counter()
+        keycode = cv2.waitKey(max(1, int(remaining * 1000)))
+        # sub-millisecond remainder
+        while perf_counter() < self.deadline and keycode == -1:
+            pass
+        self.n_slot += 1
+        self.n_shown += 1
+        return keycode
@@ -0,0 +1,216 @@
+# python OpenCV QT player
+#
+# A capture thread decodes the video (or frame directory, or camera) and
+# paces it at --fps. Each frame goes into a single "latest frame" slot and
+# the UI is notified with a pyqtSignal only when the slot was empty, so a
+# slow UI drops frames (latest frame wins) instead of queueing them without
+# limit. The QImage is built directly on the decoded numpy buffer (no copy),
+# and an fps / latency / dropped-frames readout is drawn under the picture.
+#
+# keys: space = pause/resume, q/Escape = quit
+
+import os
+import sys
+import argparse
+import threading
+import cv2
+from time import perf_counter, sleep
+from PyQt5 import QtGui,QtCore,QtWidgets
+from PyQt5.QtGui import QImage
+from .video_probe import VideoProbe
+from .frame_decode import decode_frames
+
+parser = argparse.ArgumentParser()
+
+parser.add_argument('--infile', type=str, default=None,
+                    help="input file in .mp4, .avi, .mov, or .mkv format, or a frame directory")
+
+parser.add_argument('--camera', type=int, default=None,
+                    help="capture from this camera device instead of a file")
+
+parser.add_argument('--fps', type=float, default=None,
+                    help="video replay frame rate, frames per second (default = file rate or 60)")
+
+parser.add_argument('--info', action='store_true',
+                    help="output video information")
+
+# decoded frames are BGR; Qt >= 5.14 can display them without a conversion
+if hasattr(QImage, 'Format_BGR888'):
+    QIMAGE_FORMAT, CONVERT = QImage.Format_BGR888, None
+else:
+    QIMAGE_FORMAT, CONVERT = QImage.Format_RGB888, cv2.COLOR_BGR2RGB
+
+
+class LatestFrame:
+    # single-slot mailbox between the capture thread and the UI
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.item = None
+        self.n_dropped = 0
+
+    def put(self, item):
+        # returns True if the UI has to be notified (the slot was empty)
+        with self.lock:
+            was_empty = self.item is None
+            if not was_empty:
+                self.n_dropped += 1  # the UI never saw the previous frame
+            self.item = item
+        return was_empty
+
+    def take(self):
+        with self.lock:
+            item, self.item = self.item, None
+        return item
+
+
+class CaptureThread(QtCore.QThread):
+    frameReady = QtCore.pyqtSignal()
+
+    def __init__(self, source, fps, slot):
+        # source: video file, frame directory or camera index
+        # fps: pacing rate, None for live sources (camera)
+        super(CaptureThread, self).__init__()
+        self.source = source
+        self.spf = 1.0 / fps if fps else None
+        self.slot = slot
+
+        # The boolean variable to break the while loop in self.run() method
+        self.running = True
+        self.paused = threading.Event()
+
+    def frames(self):
+        if isinstance(self.source, str) and os.path.isdir(self.source):
+            yield from decode_frames(VideoProbe(self.source).files)
+            return
+
+        camera = cv2.VideoCapture(self.source)
+        assert camera.isOpened(), f"Could not open {self.source}"
+        while self.running:
+            ret, frame = camera.read()
+            if not ret: break
+            yield frame
+        camera.release()
+
+    def run(self):
+        start = perf_counter()
+        for i, frame in enumerate(self.frames()):
+            if not self.running:
+                break
+
+            if self.paused.is_set():
+                t_pause = perf_counter()
+                while self.paused.is_set() and self.running:
+                    sleep(0.01)
+                start += perf_counter() - t_pause
+
+            if CONVERT is not None:
+                cv2.cvtColor(frame, CONVERT, dst=frame)
+            t_decoded = perf_counter()
+
+            # Emit the frame to the QWidget object, unless it has not taken the last one yet
+            if self.slot.put((i, frame, t_decoded)):
+                self.frameReady.emit()
+
+            if self.spf is not None:
+                # absolute deadline, so timing errors do not accumulate
+                delay = start + (i + 1) * self.spf - perf_counter()
+                if delay > 0:
+                    sleep(delay)
+
+    def stop(self):
+        # Terminate the while loop in self.run() method
+        self.running = False
+        self.paused.clear()
+        self.wait()
+
+
+class VideoCapture(QtWidgets.QWidget):
+    def __init__(self, source, fps, size=None):
+        # Use super() to call __init__() methods in the parent classes
+        super(VideoCapture, self).__init__()
+        self.setWindowTitle("Play video QT")
+
+        # The instantiated QLabel object should belong to the 'self' QWidget object
+        self.label = QtWidgets.QLabel(self)
+        self.readout = QtWidgets.QLabel(self)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.label)
+        layout.addWidget(self.readout)
+        if size is not None:
+            self.label.setFixedSize(*size)
+
+        self.n_shown = 0
+        self.latency = 0.0
+        self.t_readout = perf_counter()
+
+        # Instantiate a QThread object. No need to pass in the parent QWidget object.
+        self.slot = LatestFrame()
+        self.workThread = CaptureThread(source, fps, self.slot)
+
+        # Connect signal from self.workThread to the slot self.draw (queued across threads)
+        self.workThread.frameReady.connect(self.draw)
+        self.workThread.finished.connect(self.update_readout)
+
+        self.workThread.start()
+
+    def closeEvent(self, event):
+        self.workThread.stop()
+        event.accept()
+
+    def keyPressEvent(self, event):
+        if event.key() == QtCore.Qt.Key_Space:
+            if self.workThread.paused.is_set():
+                self.workThread.paused.clear()
+            else:
+                self.workThread.paused.set()
+        elif event.key() in (QtCore.Qt.Key_Q, QtCore.Qt.Key_Escape):
+            self.close()
+
+    def draw(self):
+        item = self.slot.take()
+        if item is None:
+            return
+        i, img, t_decoded = item
+
+        height, width, channel = img.shape
+        # QImage wraps the numpy buffer; the pixmap takes its own copy for display
+        self.qImg = QImage(img.data, width, height, img.strides[0], QIMAGE_FORMAT)
+        self.label.setPixmap(QtGui.QPixmap.fromImage(self.qImg))
+
+        self.n_shown += 1
+        self.latency = perf_counter() - t_decoded
+        self.frame_i = i
+        if perf_counter() - self.t_readout >= 0.5:
+            self.update_readout()
+
+    def update_readout(self):
+        now = perf_counter()
+        elapsed = now - self.t_readout
+        fps = self.n_shown / elapsed if elapsed > 0 else 0.0
+        self.readout.setText(f"frame {getattr(self, 'frame_i', 0)}   {fps:.1f} fps   "
+                             f"latency {self.latency * 1000:.1f} ms   dropped {self.slot.n_dropped}")
+        self.t_readout, self.n_shown = now, 0
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    assert args.infile or args.camera is not None, "Specify --infile or --camera"
+
+    size = None
+    if args.camera is not None:
+        source, fps = args.camera, args.fps  # live: paced by the camera unless --fps is given
+    else:
+        probe = VideoProbe(args.infile)
+        probe.release()
+        size = probe.size
+        source, fps = args.infile, args.fps or probe.fps or 60
+        if args.info:
+            print(f"File spec FPS ={probe.fps}")
+            print(f"File spec vcodec ={probe.fourcc}")
+            print(f"File spec n_frames ={probe.n_frames}")
+            print(f"Replay FPS ={fps}")
+
+    app = QtWidgets.QApplication(sys.argv)
+    video_capture_widget = VideoCapture(source, fps, size)
+    video_capture_widget.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,241 @@
+# python OpenCV Tk player
+#
+# Frames are decoded and converted to RGB PPM data on a background thread
+# (ReadAhead) through a preallocated buffer, and the Tk main loop only hands
+# the ready data to a single reused PhotoImage (no PIL, no RGBA round
+# trip, no new image object per frame). Frames are scheduled against
+# absolute deadlines at --fps, late frames can be dropped, and the slider
+# seeks through the keyframe index (videos) or the frame list (directories).
+#
+# keys: space = pause/resume, Left/Right = step (pauses), Home = restart, q/Escape = quit
+
+import argparse
+import numpy as np
+import cv2
+import tkinter as tk
+from queue import Empty
+from time import perf_counter
+from .video_probe import VideoProbe
+from .seek_index import SeekIndex
+from .frame_decode import decode_frames
+from .playback import ReadAhead, Pacer
+
+#get arguments
+parser = argparse.ArgumentParser()
+
+parser.add_argument('--infile', type=str, required=True,
+                    help="input file in .mp4, .avi, .mov, or .mkv format, or a frame directory")
+
+parser.add_argument('--fps', type=int, default=None,
+                    help="video replay frame rate, frames per second (default = file rate or 60)")
+
+parser.add_argument('--info', action='store_true',
+                    help="output video information")
+
+parser.add_argument('--readahead', type=int, default=16,
+                    help="number of frames decoded ahead of display (default=16)")
+
+parser.add_argument('--drop_late', action='store_true',
+                    help="skip frames that are already late to keep the target frame rate")
+
+parser.add_argument('--mirror', action='store_true',
+                    help="flip frames horizontally")
+
+
+class PPMBuffer:
+    # preallocated binary PPM image; the RGB pixels are written in place
+    # through a numpy view and handed to Tk as one immutable bytes object
+    def __init__(self, width, height):
+        header = b'P6 %d %d 255\n' % (width, height)
+        self.buf = bytearray(len(header) + width * height * 3)
+        self.buf[:len(header)] = header
+        self.rgb = np.frombuffer(self.buf, np.uint8, offset=len(header)).reshape(height, width, 3)
+
+    def convert(self, frame, mirror=False):
+        if mirror:
+            cv2.flip(frame, 1, dst=frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return bytes(self.buf)
+
+
+def read_video(vfile, seek_index, first):
+    cap = cv2.VideoCapture(vfile)
+    if first > 0:
+        seek_index.seek(cap, first)
+    while True:
+        ret, frame = cap.read()
+        if not ret: break
+        yield frame
+    cap.release()
+
+
+def read_frames(probe, seek_index, first, ppm, mirror):
+    # (i, ppm data) from frame `first` on, runs on the ReadAhead thread
+    if probe.isdir:
+        frames = decode_frames(probe.files[first:])
+    else:
+        frames = read_video(probe.path, seek_index, first)
+
+    for i, frame in enumerate(frames, first):
+        yield i, ppm.convert(frame, mirror)
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    vfile = args.infile
+
+    probe = VideoProbe(vfile)
+    seek_index = None if probe.isdir else SeekIndex(vfile)
+    n_frames = probe.n_frames if probe.isdir else seek_index.n_frames
+    width, height = probe.size
+    probe.release()
+
+    fps = args.fps or probe.fps or 60
+    if args.info:
+        print(f"File spec FPS ={probe.fps}")
+        print(f"File spec vcodec ={probe.fourcc}")
+        print(f"File spec n_frames ={n_frames}")
+        print(f"Replay FPS ={fps}")
+
+    ppm = PPMBuffer(width, height)
+    pacer = Pacer(fps, drop_late=args.drop_late)
+
+    #Set up GUI
+    window = tk.Tk()  #Makes main window
+    window.wm_title("Play video Tk")
+    window.config(background="#FFFFFF")
+
+    #Graphics window
+    imageFrame = tk.Frame(window, width=width, height=height)
+    imageFrame.grid(row=0, column=0, padx=10, pady=2)
+
+    photo = tk.PhotoImage(width=width, height=height)
+    lmain = tk.Label(imageFrame, image=photo)
+    lmain.grid(row=0, column=0)
+
+    #Slider window (slider controls stage position)
+    sliderFrame = tk.Frame(window, width=width, height=100)
+    sliderFrame.grid(row=1, column=0, padx=10, pady=2, sticky='ew')
+    position = tk.IntVar(value=0)
+    slider = tk.Scale(sliderFrame, from_=0, to=max(n_frames - 1, 0), orient=tk.HORIZONTAL,
+                      variable=position, showvalue=True, length=width)
+    slider.pack(fill=tk.X)
+    status = tk.Label(sliderFrame, text="", anchor='w')
+    status.pack(fill=tk.X)
+
+    state = dict(reader=None, i=0, paused=False, dragging=False, job=None,
+                 t_last=perf_counter(), n_fps=0)
+
+    def open_at(first):
+        # (re)start the decoder thread at frame `first`
+        if state['reader'] is not None:
+            state['reader'].stop()
+        first = min(max(first, 0), n_frames - 1)
+        state['reader'] = ReadAhead(read_frames(probe, seek_index, first, ppm, args.mirror),
+                                    size=args.readahead)
+        state['i'] = first
+        pacer.reset()
+
+    def next_item(block):
+        try:
+            item = state['reader'].queue.get(block=block, timeout=1.0 if block else None)
+        except Empty:
+            return None
+        if not isinstance(item, tuple):  # end of the stream
+            state['reader'].queue.put(item)
+            if state['reader'].error is not None:
+                raise state['reader'].error
+            return False
+        return item
+
+    def show(item):
+        i, data = item
+        photo.configure(data=data, format='PPM')
+        state['i'] = i
+        if not state['dragging']:
+            position.set(i)
+
+        state['n_fps'] += 1
+        now = perf_counter()
+        if now - state['t_last'] >= 1.0:
+            status.configure(text=f"frame {i}/{n_frames - 1}   {state['n_fps'] / (now - state['t_last']):.1f} fps"
+                                  f"   dropped {pacer.n_dropped}")
+            state['t_last'], state['n_fps'] = now, 0
+
+    def schedule(delay):
+        state['job'] = window.after(max(1, int(delay * 1000)), tick)
+
+    def tick():
+        state['job'] = None
+        if state['paused'] or state['dragging']:
+            return
+
+        item = next_item(block=False)
+        if item is None:  # decoder behind, try again shortly
+            schedule(0.001)
+            return
+        if item is False:  # end of the stream: stay on the last frame
+            state['paused'] = True
+            return
+
+        # drop late frames while newer ones are already decoded
+        while pacer.drop_late and pacer.is_late() and state['reader'].queue.qsize() > 1:
+            pacer.skip()
+            newer = next_item(block=False)
+            if not newer:
+                break
+            item = newer
+
+        show(item)
+        schedule(pacer.advance())
+
+    def play():
+        if state['job'] is None:
+            pacer.reset()
+            schedule(0)
+
+    def seek(first, resume):
+        if state['job'] is not None:
+            window.after_cancel(state['job'])
+            state['job'] = None
+        open_at(first)
+        item = next_item(block=True)
+        if item:
+            show(item)
+        if resume:
+            play()
+
+    def on_press(event):
+        state['dragging'] = True
+
+    def on_release(event):
+        state['dragging'] = False
+        seek(position.get(), not state['paused'])
+
+    def toggle_pause(event=None):
+        state['paused'] = not state['paused']
+        if not state['paused']:
+            play()
+
+    def step(delta):
+        state['paused'] = True
+        seek(state['i'] + delta, False)
+
+    def quit(event=None):
+        if state['reader'] is not None:
+            state['reader'].stop()
+        window.destroy()
+
+    slider.bind('<ButtonPress-1>', on_press)
+    slider.bind('<ButtonRelease-1>', on_release)
+    window.bind('<space>', toggle_pause)
+    window.bind('<Left>', lambda e: step(-1))
+    window.bind('<Right>', lambda e: step(1))
+    window.bind('<Home>', lambda e: seek(0, not state['paused']))
+    window.bind('q', quit)
+    window.bind('<Escape>', quit)
+    window.protocol("WM_DELETE_WINDOW", quit)
+
+    open_at(0)
+    play()
+    window.mainloop()  #Starts GUI
@@ -0,0 +1,217 @@
+# Low-resolution review proxies
+#
+# A proxy is a downscaled copy of a video or frame directory, kept next to
+# the source as hidden files:
+#
+#   .<name>.proxy<H>.mp4   - frames scaled to height H, intra-only H.264
+#                            (every frame is a keyframe, so seeking is cheap)
+#   .<name>.proxy<H>/      - mask directories (or frame lists): PNG masks scaled
+#                            with nearest neighbour, so they stay binary
+#   .<name>.proxy<H>.json  - source key (size, mtime) and frame count, written
+#                            last, so a proxy without it is incomplete
+#
+# Proxy frame i is source frame i (every decoded frame is kept), so frame
+# numbers map back to the original one to one. play_video --proxy plays from the proxies and starts a
+# background build (this script, in its own process) for missing ones.
+#
+# Build proxies from the command line:
+#   python -m opencvutils.proxy --inputs clip1.mp4 clip2_frames --masks clip1_masks --jobs 4
+
+import os
+import sys
+import cv2
+import json
+import shutil
+import argparse
+import subprocess as sp
+from .video_probe import VideoProbe
+from .frame_index import is_frame_list
+from .frame_decode import decode_frames
+from .frame_writer import FrameWriter
+from .video_encoder import VideoEncoder
+
+PROXY_VERSION = 1
+DEFAULT_HEIGHT = 360
+
+
+def _hidden(path, suffix):
+    path = os.path.abspath(path).rstrip(os.sep)
+    return os.path.join(os.path.dirname(path), '.' + os.path.basename(path) + suffix)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+class Proxy:
+    def __init__(self, source, height=DEFAULT_HEIGHT, mask=False):
+        assert os.path.exists(source), f"Proxy source was not found: {source}"
+        self.source = source
+        self.height = height
+        self.mask = mask
+        assert not mask or os.path.isdir(source) or is_frame_list(source), \
+            f"Mask proxies need a mask directory or frame list: {source}"
+
+        tag = f'.proxy{height}'
+        self.path = _hidden(source, tag if mask else tag + '.mp4')
+        self.meta_file = _hidden(source, tag + '.json')
+        self.lock_file = _hidden(source, tag + '.lock')
+        self.meta = self._load()
+
+    def _key(self):
+        st = os.stat(self.source)
+        return dict(version=PROXY_VERSION, path=os.path.abspath(self.source),
+                    size=st.st_size, mtime=st.st_mtime_ns)
+
+    def _load(self):
+        try:
+            with open(self.meta_file) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('key') != self._key() or not os.path.exists(self.path):
+            return None
+        return meta
+
+    ### access
+    @property
+    def ready(self):
+        return self.meta is not None
+
+    @property
+    def n_frames(self):
+        return self.meta['n_frames']
+
+    @property
+    def size(self):
+        # (width, height) of the proxy frames
+        return tuple(self.meta['size'])
+
+    ### building
+    def _frames(self, probe, workers=None):
+        flags = cv2.IMREAD_GRAYSCALE if self.mask else cv2.IMREAD_COLOR
+        if probe.isdir:
+            yield from decode_frames(probe.files, flags=flags, workers=workers)
+            return
+        cap = probe.capture()
+        while True:
+            ret, frame = cap.read()
+            if not ret: break
+            yield frame
+        cap.release()
+
+    def build(self, workers=None, force=False):
+        # writes the proxy, returns self (rebuilt only if missing or out of date)
+        if self.ready and not force:
+            return self
+
+        probe = VideoProbe(self.source)
+        w, h = probe.size
+        ph = min(self.height, h)
+        pw = max(2, round(w * ph / h / 2) * 2)  # even width for yuv420p
+        ph -= ph % 2
+        interp = cv2.INTER_NEAREST if self.mask else cv2.INTER_AREA
+
+        if os.path.exists(self.meta_file):
+            os.remove(self.meta_file)  # invalid until the rebuild completes
+
+        n = 0
+        if self.mask:
+            if os.path.isdir(self.path):
+                shutil.rmtree(self.path)  # no stale masks from an earlier build
+            os.makedirs(self.path)
+            # numbered in frame order (the source names of a frame list need not sort that way)
+            width = len(str(len(probe.files)))
+            names = [str(i).rjust(width, '0') + '.png' for i in range(len(probe.files))]
+            with FrameWriter(workers) as writer:
+                for n, (name, mask) in enumerate(zip(names, self._frames(probe, workers)), 1):
+                    writer.write(os.path.join(self.path, name),
+                                 cv2.resize(mask, (pw, ph), interpolation=interp))
+        else:
+            partial = _hidden(self.source, f'.proxy{self.height}.partial.mp4')
+            with VideoEncoder(partial, probe.fps or 25, (ph, pw), codec='libx264',
+                              preset='veryfast', crf=20, gop=1, threads=workers) as encoder:
+                for n, frame in enumerate(self._frames(probe, workers), 1):
+                    encoder.write(cv2.resize(frame, (pw, ph), interpolation=interp), copy=False)
+            os.replace(partial, self.path)
+
+        meta = dict(key=self._key(), n_frames=n, size=[pw, ph], source_size=[w, h],
+                    fps=probe.fps)
+        with open(self.meta_file, 'w') as f:
+            json.dump(meta, f)
+        self.meta = meta
+        return self
+
+    def build_in_background(self):
+        # starts a detached build process unless one is already running,
+        # returns True if a build is (now) under way
+        if self.ready:
+            return False
+        try:
+            fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(self.lock_file) as f:
+                    pid = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                pid = 0
+            if pid and _pid_alive(pid):
+                return True
+            os.remove(self.lock_file)  # stale lock from a build that died
+            return self.build_in_background()
+        except OSError:
+            return False  # read-only storage
+
+        command = [sys.executable, '-m', __package__ + '.proxy', '--height', str(self.height),
+                   '--lock', self.lock_file]
+        command += ['--masks', self.source] if self.mask else ['--inputs', self.source]
+        # the package must be importable from the child, also when it is not installed
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+        proc = sp.Popen(command, stdout=sp.DEVNULL, stderr=sp.DEVNULL, start_new_session=True, env=env)
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(proc.pid))
+        return True
+
+
+def _build(source, height, mask, workers, force):
+    proxy = Proxy(source, height, mask).build(workers, force)
+    return source, proxy.n_frames, proxy.size
+
+
+if __name__ == '__main__':
+    from concurrent.futures import ProcessPoolExecutor
+
+    parser = argparse.ArgumentParser(prog='python -m opencvutils.proxy')
+    parser.add_argument('--inputs', type=str, nargs='*', default=[],
+                        help="videos or frame directories")
+    parser.add_argument('--masks', type=str, nargs='*', default=[],
+                        help="mask directories")
+    parser.add_argument('--height', type=int, default=DEFAULT_HEIGHT,
+                        help=f"proxy frame height (default={DEFAULT_HEIGHT})")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of proxies built in parallel (default=1)")
+    parser.add_argument('--force', action='store_true', help="rebuild up-to-date proxies")
+    parser.add_argument('--lock', type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    jobs = [(s, False) for s in args.inputs] + [(s, True) for s in args.masks]
+    assert jobs, "Specify --inputs and/or --masks"
+    workers = max(1, (os.cpu_count() or 1) // max(args.jobs, 1))
+
+    try:
+        with ProcessPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+            futures = [pool.submit(_build, s, args.height, m, workers, args.force) for s, m in jobs]
+            for fut in futures:
+                source, n, (w, h) = fut.result()
+                print(f"{source}: {n} frames, proxy {w}x{h}")
+    finally:
+        if args.lock and os.path.exists(args.lock):
+            os.remove(args.lock)
+    print("\nCompleted successfully")
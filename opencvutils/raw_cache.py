@@ -0,0 +1,188 @@
+# Memory-mapped raw frame cache
+#
+# A video or frame directory (and optionally its mask directory) is decoded
+# once into a cache directory holding
+#
+#   frames.npy   - n_frames x H x W x 3 uint8 (BGR)
+#   masks.npy    - n_frames x H x W uint8 (optional)
+#   source.json  - what the cache was built from (path, size, mtime)
+#
+# The .npy files are plain numpy arrays with a small header, opened with
+# np.load(mmap_mode='r'), so replay serves read-only zero-copy views of the
+# page cache instead of decoding JPEG/PNG/video again.
+#
+# Build a cache from the command line:
+#   python -m opencvutils.raw_cache --infile clip.mp4 --maskdir clip_masks --cachedir clip.rawcache
+
+import os
+import cv2
+import json
+import argparse
+import numpy as np
+from numpy.lib.format import open_memmap
+from .video_probe import VideoProbe
+from .seek_index import SeekIndex
+from .frame_decode import decode_frames, add_decode_args
+from .mask_store import MaskStore, is_mask_store
+
+CACHE_VERSION = 1
+
+
+def _stat_key(path):
+    if path is None:
+        return None
+    st = os.stat(path)
+    return dict(path=os.path.abspath(path), size=st.st_size, mtime=st.st_mtime_ns)
+
+
+def source_key(vfile, maskdir=None):
+    return dict(version=CACHE_VERSION, frames=_stat_key(vfile), masks=_stat_key(maskdir))
+
+
+def _iter_source(probe, flags=cv2.IMREAD_COLOR, **decode_kw):
+    if probe.isdir:
+        yield from decode_frames(probe.files, flags=flags, **decode_kw)
+    else:
+        cap = probe.capture()
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+        cap.release()
+
+
+def _fill(fname, probe, shape, flags=cv2.IMREAD_COLOR, **decode_kw):
+    # decodes up to shape[0] frames into fname, returns the number decoded
+    arr = open_memmap(fname, mode='w+', dtype=np.uint8, shape=shape)
+    n = 0
+    for n, frame in enumerate(_iter_source(probe, flags, **decode_kw), 1):
+        if n > shape[0]:
+            break
+        arr[n - 1] = frame
+    arr.flush()
+    n = min(n, shape[0])
+
+    if n < shape[0]:
+        # the source decoded fewer frames: rewrite with a header for the actual count
+        partial = fname + '.partial.npy'
+        out = open_memmap(partial, mode='w+', dtype=np.uint8, shape=(n,) + tuple(shape[1:]))
+        out[:] = arr[:n]
+        out.flush()
+        del out
+        del arr
+        os.replace(partial, fname)
+    else:
+        del arr
+    return n
+
+
+def build_cache(vfile, cachedir, maskdir=None, **decode_kw):
+    # decode vfile (and maskdir) into cachedir, returns the opened RawFrameCache
+    os.makedirs(cachedir, exist_ok=True)
+    meta_file = os.path.join(cachedir, 'source.json')
+    if os.path.exists(meta_file):
+        os.remove(meta_file)  # invalid until the rebuild completes
+
+    probe = VideoProbe(vfile)
+    w, h = probe.size
+    # the container frame count is only an estimate, the packet index is exact
+    n_frames = probe.n_frames if probe.isdir else SeekIndex(vfile).n_frames
+    n_frames = _fill(os.path.join(cachedir, 'frames.npy'), probe, (n_frames, h, w, 3), **decode_kw)
+    assert n_frames, f"No frames decoded from {vfile}"
+
+    if is_mask_store(maskdir):
+        store = MaskStore(maskdir)
+        assert len(store) == n_frames and store.shape == (h, w), \
+            f"Mask store {maskdir} has {len(store)} masks of {store.shape}, expected {n_frames} of {(h, w)}"
+        masks = open_memmap(os.path.join(cachedir, 'masks.npy'), mode='w+', dtype=np.uint8,
+                            shape=(n_frames, h, w))
+        for i, mask in enumerate(store.frames()):
+            masks[i] = mask
+        masks.flush()
+        del masks
+    elif maskdir is not None:
+        mask_probe = VideoProbe(maskdir)
+        assert mask_probe.n_frames == n_frames, \
+            f"Mismatch in number of mask files versus number of frames\n" + \
+            f"n_frames={n_frames}, n_masks={mask_probe.n_frames}"
+        n_masks = _fill(os.path.join(cachedir, 'masks.npy'), mask_probe, (n_frames, h, w),
+                        flags=cv2.IMREAD_GRAYSCALE, **decode_kw)
+        assert n_masks == n_frames, f"Only {n_masks} of {n_frames} masks decoded from {maskdir}"
+
+    with open(meta_file, 'w') as f:
+        json.dump(dict(key=source_key(vfile, maskdir), fps=probe.fps, fourcc=probe.fourcc), f)
+
+    return RawFrameCache(cachedir)
+
+
+class RawFrameCache:
+    def __init__(self, cachedir):
+        meta_file = os.path.join(cachedir, 'source.json')
+        assert os.path.exists(meta_file), f"No complete raw frame cache in {cachedir}"
+        with open(meta_file) as f:
+            self.meta = json.load(f)
+
+        self.cachedir = cachedir
+        self.frames = np.load(os.path.join(cachedir, 'frames.npy'), mmap_mode='r')
+        mask_file = os.path.join(cachedir, 'masks.npy')
+        self.masks = np.load(mask_file, mmap_mode='r') if os.path.exists(mask_file) else None
+
+    @property
+    def n_frames(self):
+        return self.frames.shape[0]
+
+    @property
+    def size(self):
+        return (self.frames.shape[2], self.frames.shape[1])
+
+    @property
+    def fps(self):
+        return self.meta.get('fps')
+
+    def matches(self, vfile, maskdir=None):
+        # True if the cache was built from the current state of vfile (and maskdir)
+        try:
+            key = source_key(vfile, maskdir)
+        except OSError:
+            return False
+        return self.meta.get('key') == key
+
+    def get_frame(self, startframe=0, finishframe=None):
+        # zero-copy, read-only views
+        for i in range(startframe, finishframe or self.n_frames):
+            yield self.frames[i]
+
+    def get_mask(self, startframe=0, finishframe=None):
+        assert self.masks is not None, f"Raw frame cache {self.cachedir} has no masks"
+        for i in range(startframe, finishframe or self.n_frames):
+            yield self.masks[i]
+
+
+def open_cache(vfile, cachedir, maskdir=None, **decode_kw):
+    # opens cachedir if it is up to date for vfile/maskdir, (re)builds it otherwise
+    if os.path.exists(os.path.join(cachedir, 'source.json')):
+        cache = RawFrameCache(cachedir)
+        if cache.matches(vfile, maskdir):
+            return cache
+        del cache
+    print(f"Building raw frame cache in {cachedir} ...")
+    return build_cache(vfile, cachedir, maskdir, **decode_kw)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m opencvutils.raw_cache')
+    parser.add_argument('--infile', type=str, required=True,
+                        help="input video file or frame directory")
+    parser.add_argument('--maskdir', type=str, default=None,
+                        help="(optional) mask directory to cache alongside the frames")
+    parser.add_argument('--cachedir', type=str, default=None,
+                        help="cache directory (default = input name + '.rawcache')")
+    add_decode_args(parser)
+    args = parser.parse_args()
+
+    cachedir = args.cachedir or args.infile.rstrip('/') + '.rawcache'
+    cache = build_cache(args.infile, cachedir, args.maskdir, workers=args.workers,
+                        prefetch=args.prefetch, use_processes=args.decode_processes)
+    print(f"Cached {cache.n_frames} frames of {cache.size[0]}x{cache.size[1]} in {cachedir}")
+    print("\nCompleted successfully")
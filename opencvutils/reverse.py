@@ -0,0 +1,171 @@
+# Copy-free sequence reversal
+#
+# Frame and mask directories are reversed without copying image data:
+#
+#   hardlink - new directory entries for the same files (default, falls back
+#              to symlinks across file systems)
+#   symlink  - relative symbolic links to the source files
+#   manifest - no directory at all, just '<output>.txt' listing
+#              "<new name>\t<source file>" in reversed order, a frame list
+#              that play / encode / FrameIndex read like a directory
+#
+# The reversed sequence is renumbered from --first (default 1) with
+# zero-padded names, and named like Analysis/FrameMaskReversal.ipynb did:
+# X -> X_rev, X_mask -> X_rev_mask, X_frame -> X_rev_frame.
+#
+# Videos are reversed by decoding keyframe-aligned chunks (GOPs, split
+# further into at most --chunk frames) forward and emitting each chunk
+# backwards, so memory use is bounded by one chunk.
+#
+#   opencvutils reverse --frames data/Human6 data/Human6_mask data/Human6_frame
+#   opencvutils reverse --video clip.mp4 --outvideo clip_rev.mp4
+
+import os
+import cv2
+import argparse
+from .frame_index import FrameIndex
+from .video_probe import VideoProbe
+from .seek_index import SeekIndex
+from .video_encoder import VideoEncoder, add_encoder_args, encoder_kw_from_args
+
+MODES = ('hardlink', 'symlink', 'manifest')
+DEFAULT_CHUNK = 64
+
+
+def reversed_dirname(path):
+    # X -> X_rev, X_mask -> X_rev_mask, X_frame -> X_rev_frame
+    path = path.rstrip(os.sep)
+    for tag in ('_mask', '_frame'):
+        if path.endswith(tag):
+            return path[:-len(tag)] + '_rev' + tag
+    return path + '_rev'
+
+
+def reversed_names(files, first=1, width=None):
+    # [(new name, source file)] with the last source file numbered `first`
+    if width is None:
+        width = max(4, len(str(first + len(files) - 1)))
+    return [(str(i).rjust(width, '0') + os.path.splitext(f)[1], f)
+            for i, f in enumerate(reversed(files), first)]
+
+
+def reverse_dir(src, dst=None, mode='hardlink', first=1, width=None):
+    # links (or lists) the frames of src in reverse order, returns the output path
+    assert mode in MODES, f"Unknown reversal mode {mode}, use one of {MODES}"
+    dst = dst or reversed_dirname(src)
+    names = reversed_names(FrameIndex(src), first, width)
+
+    if mode == 'manifest':
+        manifest = dst if dst.endswith('.txt') else dst + '.txt'
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, 'w', encoding='utf-8') as f:
+            for name, fsrc in names:
+                f.write(f"{name}\t{os.path.relpath(os.path.abspath(fsrc), base)}\n")
+        return manifest
+
+    os.makedirs(dst, exist_ok=True)
+    n_symlinks = 0
+    for name, fsrc in names:
+        target = os.path.join(dst, name)
+        if os.path.lexists(target):
+            os.remove(target)
+        if mode == 'hardlink':
+            try:
+                os.link(fsrc, target)
+                continue
+            except OSError:
+                n_symlinks += 1  # other file system, or no hardlink support
+        os.symlink(os.path.relpath(os.path.abspath(fsrc), os.path.abspath(dst)), target)
+
+    if mode == 'hardlink' and n_symlinks:
+        print(f"{dst}: could not hardlink {n_symlinks} files, used symlinks")
+    return dst
+
+
+def chunk_bounds(keyframes, n_frames, max_chunk=DEFAULT_CHUNK):
+    # start frames of decode chunks: every keyframe, plus splits inside long GOPs
+    bounds = set()
+    for a, b in zip(keyframes, list(keyframes[1:]) + [n_frames]):
+        bounds.update(range(a, min(b, n_frames), max(max_chunk, 1)))
+    return sorted(bounds)
+
+
+def reverse_video_frames(vfile, startframe=0, finishframe=None, seek_index=None,
+                         max_chunk=DEFAULT_CHUNK):
+    # yields the frames finishframe-1 down to startframe of vfile
+    # seek_index: SeekIndex of vfile for keyframe-aligned chunks; without it the
+    # video is assumed to seek exactly (e.g. intra-only proxies)
+    cap = cv2.VideoCapture(vfile)
+    assert cap.isOpened(), f"Could not open video file: {vfile}"
+    if finishframe is None:
+        finishframe = seek_index.n_frames if seek_index else int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    keyframes = seek_index.keyframes if seek_index else [0]
+    bounds = chunk_bounds(keyframes, finishframe, max_chunk)
+
+    try:
+        for j in reversed(range(len(bounds))):
+            stop = bounds[j + 1] if j + 1 < len(bounds) else finishframe
+            if stop <= startframe:
+                break
+            lo = max(bounds[j], startframe)
+            if seek_index is not None:
+                seek_index.seek(cap, lo)
+            else:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, lo)
+
+            chunk = []
+            for _ in range(stop - lo):
+                ret, frame = cap.read()
+                if not ret: break
+                chunk.append(frame)
+            yield from reversed(chunk)
+    finally:
+        cap.release()
+
+
+def parse_args(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog)
+    parser.add_argument('--frames', type=str, nargs='*', default=[],
+                        help="frame/mask directories to reverse")
+    parser.add_argument('--output', type=str, default=None,
+                        help="output directory or manifest (single --frames input only, "
+                             "default = <input>_rev)")
+    parser.add_argument('--mode', type=str, default='hardlink', choices=MODES,
+                        help="hardlink (default), symlink or manifest")
+    parser.add_argument('--first', type=int, default=1,
+                        help="number of the first reversed frame (default=1)")
+    parser.add_argument('--width', type=int, default=None,
+                        help="zero padded width of the frame numbers (default=4)")
+    parser.add_argument('--video', type=str, default=None, help="video file to reverse")
+    parser.add_argument('--outvideo', type=str, default=None, help="reversed video output file")
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK,
+                        help=f"max frames held in memory while reversing a video (default={DEFAULT_CHUNK})")
+    add_encoder_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(args):
+    assert args.frames or args.video, "Specify --frames and/or --video"
+    assert args.output is None or len(args.frames) <= 1, "--output needs a single --frames input"
+
+    for src in args.frames:
+        out = reverse_dir(src, args.output, args.mode, args.first, args.width)
+        print(f"{src} -> {out} ({args.mode})")
+
+    if args.video:
+        assert args.outvideo, "Specify --outvideo for --video"
+        probe = VideoProbe(args.video)
+        probe.release()
+        fps = probe.fps or 25
+
+        frames = reverse_video_frames(args.video, seek_index=SeekIndex(args.video), max_chunk=args.chunk)
+        with VideoEncoder(args.outvideo, fps, **encoder_kw_from_args(args)) as encoder:
+            for frame in frames:
+                encoder.write(frame, copy=False)
+        print(f"{args.video} -> {args.outvideo} ({encoder.n_written} frames)")
+
+
+if __name__ == '__main__':
+    main(parse_args())
+    print("\nCompleted successfully")
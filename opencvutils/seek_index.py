@@ -0,0 +1,201 @@
+# Persistent keyframe / seek index for video files
+#
+# One indexing pass reads the packet list of the video stream (no decoding)
+# with ffprobe, or with ffmpeg's framecrc muxer when ffprobe is missing,
+# and records the exact frame count and the display-order frame numbers and
+# timestamps of all keyframes. Packets flagged for discard (the frames an MP4
+# edit list trims off) are decoded but never returned, so they are left out.
+# The result is kept in a JSON sidecar next to the video, keyed on size and
+# mtime.
+#
+# A seek to frame n then jumps to the nearest preceding keyframe (which the
+# backend can reach without decoding) and grab()s forward to n, so --start
+# is both fast and exact, and the frame count is correct for VFR files where
+# CAP_PROP_FRAME_COUNT is only an estimate. OpenCV turns a frame number into
+# a timestamp with the average fps, which misses keyframes of VFR files, so
+# every landing is checked against the indexed keyframe time; keyframes the
+# backend cannot land on are remembered and an earlier one (or frame 0) is
+# used instead.
+
+import os
+import cv2
+import json
+import shutil
+import bisect
+import subprocess as sp
+from fractions import Fraction
+
+INDEX_VERSION = 2
+TIME_TOLERANCE = 0.001  # seconds between the indexed and the decoded keyframe time
+
+
+def _packets_ffprobe(vfile):
+    # [(pts_seconds, is_key)] in decode order, without discarded packets
+    out = sp.run(['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+                  '-show_entries', 'packet=pts_time,dts_time,flags', '-of', 'csv=p=0', vfile],
+                 stdout=sp.PIPE, stderr=sp.PIPE, check=True).stdout.decode()
+    packets = []
+    for line in out.splitlines():
+        fields = line.strip().split(',')
+        if len(fields) < 3:
+            continue
+        pts, dts, flags = fields[:3]
+        t = pts if pts != 'N/A' else dts
+        if t == 'N/A' or 'D' in flags:
+            continue
+        packets.append((float(t), 'K' in flags))
+    return packets
+
+
+def _packets_framecrc(vfile):
+    # same as _packets_ffprobe, using "ffmpeg -c copy -f framecrc" for systems without ffprobe
+    out = sp.run(['ffmpeg', '-v', 'error', '-i', vfile, '-map', '0:v:0', '-c', 'copy',
+                  '-f', 'framecrc', '-'],
+                 stdout=sp.PIPE, stderr=sp.PIPE, check=True).stdout.decode()
+    tb = Fraction(1, 1)
+    packets = []
+    for line in out.splitlines():
+        if line.startswith('#tb 0:'):
+            tb = Fraction(line.split(':')[1].strip())
+            continue
+        if line.startswith('#') or not line.strip():
+            continue
+        # stream, dts, pts, duration, size, crc[, F=flags]
+        fields = [f.strip() for f in line.split(',')]
+        flags = 1  # no F= field means only the keyframe flag is set
+        for f in fields[6:]:
+            if f.startswith('F='):
+                flags = int(f[2:], 16)
+        if flags & 4:  # AV_PKT_FLAG_DISCARD
+            continue
+        packets.append((float(int(fields[2]) * tb), bool(flags & 1)))
+    return packets
+
+
+def _packets_cv2(vfile):
+    # last resort: count frames with grab(), only frame 0 is known to be a keyframe
+    cap = cv2.VideoCapture(vfile)
+    n = 0
+    while cap.grab():
+        n += 1
+    cap.release()
+    return [(float(i), i == 0) for i in range(n)]
+
+
+def read_packets(vfile):
+    if shutil.which('ffprobe'):
+        return _packets_ffprobe(vfile)
+    if shutil.which('ffmpeg'):
+        return _packets_framecrc(vfile)
+    return _packets_cv2(vfile)
+
+
+class SeekIndex:
+    def __init__(self, vfile, cache=True, data=None):
+        # data: an index of vfile built elsewhere (see as_dict), skips the sidecar and the scan
+        assert os.path.isfile(vfile), f"Video file not found: {vfile}"
+        self.vfile = vfile
+
+        if data is None and cache:
+            data = self._load()
+        if data is None:
+            data = self._build()
+            if cache:
+                self._save(data)
+
+        self.n_frames = data['n_frames']
+        self.keyframes = data['keyframes']    # display-order frame numbers
+        self.key_times = data['key_times']    # seconds, matching keyframes
+        self.landing = {}                      # keyframe position -> backend lands on it exactly
+
+    def _build(self):
+        packets = read_packets(self.vfile)
+        assert packets, f"No video packets found in {self.vfile}"
+
+        # decode order -> display order
+        order = sorted(range(len(packets)), key=lambda i: packets[i][0])
+        start = packets[order[0]][0]
+        keyframes, key_times = [], []
+        for n, i in enumerate(order):
+            if packets[i][1]:
+                keyframes.append(n)
+                key_times.append(packets[i][0] - start)
+        if not keyframes or keyframes[0] != 0:
+            keyframes.insert(0, 0)
+            key_times.insert(0, 0.0)
+
+        return dict(n_frames=len(packets), keyframes=keyframes, key_times=key_times)
+
+    def as_dict(self):
+        # the plain index data, e.g. to hand the index to worker processes
+        return dict(n_frames=self.n_frames, keyframes=self.keyframes, key_times=self.key_times)
+
+    ### sidecar
+    @property
+    def sidecar(self):
+        path = os.path.abspath(self.vfile)
+        return os.path.join(os.path.dirname(path), '.' + os.path.basename(path) + '.seek.json')
+
+    def _key(self):
+        st = os.stat(self.vfile)
+        return dict(version=INDEX_VERSION, size=st.st_size, mtime=st.st_mtime_ns)
+
+    def _load(self):
+        try:
+            with open(self.sidecar) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('key') != self._key():
+            return None
+        return data['index']
+
+    def _save(self, data):
+        try:
+            with open(self.sidecar, 'w') as f:
+                json.dump(dict(key=self._key(), index=data), f)
+        except OSError:
+            pass
+
+    ### seeking
+    def keyframe_before(self, n):
+        # (frame number, time in seconds) of the last keyframe at or before frame n
+        i = bisect.bisect_right(self.keyframes, n) - 1
+        return self.keyframes[i], self.key_times[i]
+
+    def _land(self, cap, j):
+        # sets cap to keyframe j and grabs it, True if the grabbed frame has the indexed time
+        cap.set(cv2.CAP_PROP_POS_FRAMES, self.keyframes[j])
+        if not cap.grab():
+            return False
+        return abs(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000 - self.key_times[j]) <= TIME_TOLERANCE
+
+    def seek(self, cap, n):
+        # position cap so that the next read() returns frame n
+        assert 0 <= n < self.n_frames, f"Frame {n} out of range (n_frames={self.n_frames})"
+        i = bisect.bisect_right(self.keyframes, n) - 1
+
+        # the keyframe before n, or the closest earlier one the backend lands on exactly
+        skip = None
+        for j in range(i, 0, -1):
+            if self.landing.get(j) is False:
+                continue
+            self.landing[j] = self._land(cap, j)
+            if self.landing[j]:
+                k = self.keyframes[j]
+                if n == k:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, k)  # the check grabbed frame n, land again
+                    return cap
+                skip = n - k - 1
+                break
+
+        if skip is None:
+            # decode forward from the start
+            if i > 0 or int(cap.get(cv2.CAP_PROP_POS_FRAMES)) != 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            skip = n
+
+        for _ in range(skip):
+            if not cap.grab():
+                break
+        return cap
@@ -0,0 +1,193 @@
+# Streaming frame encoder using the FFMPEG executable
+#
+# Frames are written to ffmpeg's stdin one at a time as they are produced,
+# so memory use stays flat regardless of the clip length.
+#
+# VideoEncoder is the shared output backend of play_video, convert_frames2video
+# and direct_video2frames: frames go through a small bounded queue to a writer
+# thread that feeds the ffmpeg pipe, so encoding overlaps with decoding and
+# rendering. Codec, preset, CRF/bitrate and encoder threads are configurable
+# (see add_encoder_args).
+
+import threading
+import subprocess as sp
+import numpy as np
+from queue import Queue
+from time import perf_counter
+
+DEFAULT_BITRATE = '1500k'  # used when neither crf nor bitrate is given
+QUEUE_SIZE = 8  # frames waiting for the writer thread
+
+
+def _drain(stream, chunks):
+    # read stderr concurrently so ffmpeg can never block on a full pipe
+    for chunk in iter(lambda: stream.read(4096), b''):
+        chunks.append(chunk)
+    stream.close()
+
+
+def ffmpeg_command(outputfile, fps, size, pix_fmt='bgr24', codec='libx264', preset=None,
+                   crf=None, bitrate=None, threads=None, gop=None):
+    # size: [height, width] of the raw input frames
+    # gop: max keyframe interval (1 = intra-only, every frame seekable)
+    assert crf is None or bitrate is None, "Specify either crf or bitrate, not both"
+    if crf is None and bitrate is None:
+        bitrate = DEFAULT_BITRATE
+
+    command = ['ffmpeg',
+               '-y',  # overwrite output file if it exists
+               '-f', 'rawvideo',
+               '-s', '%dx%d' % (size[1], size[0]),  # size of one frame
+               '-pix_fmt', pix_fmt,
+               '-r', str(fps),  # frames per second
+               '-an',  # Tells FFMPEG not to expect any audio
+               '-i', '-',  # The input comes from a pipe
+               '-vcodec', codec]
+    if preset:
+        command += ['-preset', preset]
+    if crf is not None:
+        command += ['-crf', str(crf)]
+    else:
+        command += ['-b:v', str(bitrate)]
+    if gop:
+        command += ['-g', str(gop)]
+    if threads:
+        command += ['-threads', str(threads)]
+    if size[0] % 2 == 0 and size[1] % 2 == 0:
+        # yuv420p for player compatibility; it needs even dimensions, so odd-sized
+        # frames keep ffmpeg's default output format instead
+        command += ['-pix_fmt', 'yuv420p']
+    command.append(outputfile)
+    return command
+
+
+class VideoEncoder:
+    def __init__(self, outputfile, fps, size=None, pix_fmt='bgr24', codec='libx264', preset=None,
+                 crf=None, bitrate=None, threads=None, gop=None, queue_size=QUEUE_SIZE, timer=None):
+        # size: [height, width], taken from the first frame if not given
+        # timer: optional StageTimer, records the pipe write of each frame as 'encode'
+        self.outputfile = outputfile
+        self.fps = fps
+        self.size = size
+        self.pix_fmt = pix_fmt
+        self.options = dict(codec=codec, preset=preset, crf=crf, bitrate=bitrate, threads=threads,
+                            gop=gop)
+        self.timer = timer
+
+        self.queue = Queue(maxsize=max(queue_size, 1))
+        self.pipe = None
+        self.thread = None
+        self.error = None
+        self.n_written = 0
+        self.encode_time = 0.0
+
+    def _open(self, first):
+        if self.size is None:
+            self.size = first.shape[:2]
+        command = ffmpeg_command(self.outputfile, self.fps, self.size, self.pix_fmt, **self.options)
+        self.pipe = sp.Popen(command, stdin=sp.PIPE, stderr=sp.PIPE)
+
+        self.err_chunks = []
+        self.err_thread = threading.Thread(target=_drain, args=(self.pipe.stderr, self.err_chunks),
+                                           daemon=True)
+        self.err_thread.start()
+        self.thread = threading.Thread(target=self._work, daemon=True)
+        self.thread.start()
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue  # keep draining so the producer never blocks
+            frame, n = item
+            try:
+                t0 = perf_counter()
+                self.pipe.stdin.write(frame.data)
+                dt = perf_counter() - t0
+                self.encode_time += dt
+                if self.timer is not None:
+                    self.timer.add('encode', dt, n, t0)
+                self.n_written += 1
+            except (BrokenPipeError, OSError) as e:
+                self.error = e  # ffmpeg exited early, the reason is in stderr
+
+    def write(self, frame, n=None, copy=True):
+        # queues one frame, blocks while the queue is full
+        # copy=False hands over the array: the caller must not modify it afterwards
+        if self.pipe is None:
+            self._open(frame)
+        if self.error is not None:
+            self.close()
+        frame = np.array(frame, copy=True, order='C') if copy else np.ascontiguousarray(frame)
+        self.queue.put((frame, n))
+
+    def close(self):
+        # waits for ffmpeg to finish, returns the number of frames written
+        if self.pipe is None:
+            return self.n_written
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+            try:
+                self.pipe.stdin.close()
+            except BrokenPipeError:
+                pass
+            self.retcode = self.pipe.wait()
+            self.err_thread.join()
+
+        err = b''.join(self.err_chunks).decode(errors='replace')
+        assert self.retcode == 0 and self.error is None, \
+            f"ffmpeg failed writing {self.outputfile} (code={self.retcode}):\n{err}"
+        return self.n_written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self.pipe is not None and self.thread is not None:
+            self.pipe.kill()
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        return False
+
+
+def createVideoClip_Cmd(frames, outputfile, fps, size=None, pix_fmt='bgr24', timer=None, threads=None,
+                        **encoder_kw):
+    # frames: iterable of HxWx3 uint8 arrays (BGR as read by cv2 by default)
+    # size: [height, width], taken from the first frame if not given
+    # threads: ffmpeg encoder threads (default = ffmpeg's choice)
+    # encoder_kw: codec, preset, crf, bitrate, gop (see VideoEncoder)
+    # the frames are handed over to the encoder thread, the producer must not reuse them
+    with VideoEncoder(outputfile, fps, size, pix_fmt, threads=threads, timer=timer,
+                      **encoder_kw) as encoder:
+        for n, frame in enumerate(frames):
+            encoder.write(frame, n, copy=False)
+    assert encoder.n_written > 0, "No frames supplied to the video encoder"
+    return encoder.n_written
+
+
+def add_encoder_args(parser):
+    # common command line options for the ffmpeg encoder
+    parser.add_argument('--codec', type=str, default='libx264',
+                        help="ffmpeg video codec (default=libx264)")
+    parser.add_argument('--preset', type=str, default=None,
+                        help="encoder preset, e.g. ultrafast..veryslow for libx264 (default = codec default)")
+    parser.add_argument('--crf', type=int, default=None,
+                        help="constant rate factor, e.g. 18..28 for libx264 (overrides --bitrate)")
+    parser.add_argument('--bitrate', type=str, default=None,
+                        help=f"target video bitrate (default={DEFAULT_BITRATE} unless --crf is given)")
+    parser.add_argument('--encoder_threads', type=int, default=None,
+                        help="number of ffmpeg encoder threads (default = ffmpeg's choice)")
+    return parser
+
+
+def encoder_kw_from_args(args):
+    return dict(codec=args.codec, preset=args.preset, crf=args.crf,
+                bitrate=None if args.crf is not None else args.bitrate,
+                threads=args.encoder_threads)
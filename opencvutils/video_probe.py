@@ -0,0 +1,104 @@
+# Single-pass probe of a video file or frame directory
+#
+# The source is opened once and fps, fourcc, frame count, size and (for
+# directories) the sorted frame list are cached on the probe object. The
+# still-open capture can be handed on to the frame reader, so playback does
+# not have to open the container again. Optionally the results are kept in a
+# small JSON sidecar next to the source, keyed on path, size and mtime
+# (frame directories also keep their FrameIndex manifest).
+
+import os
+import cv2
+import json
+from .frame_index import FrameIndex, is_frame_list
+
+
+def fourcc_to_string(vcodec):
+    return "".join([chr((int(vcodec) >> 8 * i) & 0xFF) for i in range(4)])
+
+
+class VideoProbe:
+    FIELDS = ('fps', 'fourcc', 'n_frames', 'width', 'height')
+
+    def __init__(self, path, cache=False):
+        assert os.path.exists(path), f"Input file was not found: {path}"
+        self.path = path
+        self.isdir = os.path.isdir(path) or is_frame_list(path)  # a sequence of image files
+        self._cap = None
+        self.files = FrameIndex(path) if self.isdir else None
+
+        info = self._load_sidecar() if cache else None
+        if info is None:
+            info = self._probe()
+            if cache:
+                self._save_sidecar(info)
+
+        for k in self.FIELDS:
+            setattr(self, k, info[k])
+
+    def _probe(self):
+        if self.isdir:
+            img = cv2.imread(self.files[0])
+            assert img is not None, f"Could not read image file: {self.files[0]}"
+            height, width = img.shape[:2]
+            return dict(fps=None, fourcc=None, n_frames=len(self.files),
+                        width=width, height=height)
+
+        cap = cv2.VideoCapture(self.path)
+        assert cap.isOpened(), f"Could not open video file: {self.path}"
+        info = dict(fps=cap.get(cv2.CAP_PROP_FPS),
+                    fourcc=fourcc_to_string(cap.get(cv2.CAP_PROP_FOURCC)),
+                    n_frames=int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+                    width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                    height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self._cap = cap  # kept open for the first reader
+        return info
+
+    ### sidecar cache
+    @property
+    def sidecar(self):
+        path = os.path.abspath(self.path).rstrip(os.sep)
+        return os.path.join(os.path.dirname(path), '.' + os.path.basename(path) + '.probe.json')
+
+    def _key(self):
+        st = os.stat(self.path)
+        return dict(path=os.path.abspath(self.path), size=st.st_size, mtime=st.st_mtime_ns)
+
+    def _load_sidecar(self):
+        try:
+            with open(self.sidecar) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('key') != self._key():
+            return None
+        return data.get('info')
+
+    def _save_sidecar(self, info):
+        try:
+            with open(self.sidecar, 'w') as f:
+                json.dump(dict(key=self._key(), info=info), f)
+        except OSError:
+            pass  # read-only storage: just go without the cache
+
+    ### access
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    def capture(self):
+        # returns an open cv2.VideoCapture, reusing the probe's one the first time
+        assert not self.isdir, f"{self.path} is a frame directory, not a video"
+        cap, self._cap = self._cap, None
+        if cap is None:
+            cap = cv2.VideoCapture(self.path)
+        return cap
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def __repr__(self):
+        return (f"VideoProbe({self.path!r}, fps={self.fps}, fourcc={self.fourcc!r}, "
+                f"n_frames={self.n_frames}, size={self.width}x{self.height})")
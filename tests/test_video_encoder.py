@@ -0,0 +1,40 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from opencvutils.video_encoder import ffmpeg_command, createVideoClip_Cmd, VideoEncoder
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="ffmpeg not installed")
+
+
+def _frames(n, height, width):
+    for i in range(n):
+        yield np.full((height, width, 3), i * 10 % 256, dtype=np.uint8)
+
+
+def test_command_yuv420p_only_for_even_sizes():
+    even = ffmpeg_command('out.mp4', 25, (240, 320))
+    assert even[-3:] == ['-pix_fmt', 'yuv420p', 'out.mp4']
+
+    odd = ffmpeg_command('out.mp4', 25, (241, 321))
+    assert 'yuv420p' not in odd
+    assert odd[-1] == 'out.mp4'
+
+
+@needs_ffmpeg
+def test_encode_odd_sized_frames(tmp_path):
+    outputfile = str(tmp_path / 'odd.mp4')
+    assert createVideoClip_Cmd(_frames(5, 241, 321), outputfile, 25) == 5
+    assert (tmp_path / 'odd.mp4').stat().st_size > 0
+
+
+@needs_ffmpeg
+@pytest.mark.parametrize('name', ['odd.mp4', 'odd.avi'])
+def test_encoder_odd_sized_frames(tmp_path, name):
+    outputfile = str(tmp_path / name)
+    with VideoEncoder(outputfile, 25, codec='libx264', preset='ultrafast', crf=23) as encoder:
+        for n, frame in enumerate(_frames(5, 241, 321)):
+            encoder.write(frame, n)
+    assert encoder.n_written == 5
+    assert (tmp_path / name).stat().st_size > 0